@@ -1,7 +1,11 @@
 """
 Configuration management for the copy trading bot
 """
+import json
+import math
 import os
+import tempfile
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -29,9 +33,15 @@ class Config:
     # "fixed": Always trade fixed amount (use LOT_SIZE_VALUE as SOL amount)
     # "percentage": Trade percentage of master wallet amount (use LOT_SIZE_VALUE as percentage, e.g., 10 for 10%)
     # "multiplier": Multiply master wallet amount (use LOT_SIZE_VALUE as multiplier, e.g., 2 for 2x)
-    LOT_SIZE_MODE = os.getenv("LOT_SIZE_MODE", "percentage")  # Default: percentage
+    LOT_SIZE_MODE = os.getenv("LOT_SIZE_MODE", "percentage").lower()  # Default: percentage
     LOT_SIZE_VALUE = float(os.getenv("LOT_SIZE_VALUE", "10.0"))  # Default: 10% of master wallet
     
+    # Jupiter API Configuration
+    # Leave empty to use the public endpoint (low rate limit)
+    JUPITER_BASE_URL = os.getenv("JUPITER_BASE_URL", "")
+    JUPITER_SWAP_URL = os.getenv("JUPITER_SWAP_URL", "")  # Defaults to <JUPITER_BASE_URL>/swap
+    JUPITER_API_KEY = os.getenv("JUPITER_API_KEY", "")  # Sent as x-api-key header
+    
     # Performance Configuration
     MAX_LATENCY_MS = 150  # Maximum allowed latency in milliseconds
     MAX_COPIES_PER_DAY = 200
@@ -39,6 +49,114 @@ class Config:
     # DEX Configuration
     DEX_PLATFORMS = ["pumpkin", "radium"]  # Supported DEX platforms
     
+    # Runtime Settings (changed from Telegram, override .env values)
+    SETTINGS_FILE = os.getenv("SETTINGS_FILE", "settings.json")
+    RUNTIME_SETTINGS = ("SLIPPAGE_TOLERANCE", "TIPS_AMOUNT", "LOT_SIZE_MODE", "LOT_SIZE_VALUE")
+    # Accepted ranges for runtime settings: name -> (min, max), inclusive
+    SETTING_LIMITS = {
+        "SLIPPAGE_TOLERANCE": (0.0, 50.0),  # percent
+        "TIPS_AMOUNT": (0.0, 0.1),  # SOL
+    }
+    # Largest LOT_SIZE_VALUE per LOT_SIZE_MODE (the value must also be above 0)
+    LOT_SIZE_LIMITS = {
+        "fixed": 100.0,  # SOL per trade
+        "percentage": 100.0,  # percent of the master's amount
+        "multiplier": 10.0,  # times the master's amount
+    }
+    _settings_lock = threading.Lock()  # One update_settings() at a time
+    
+    @classmethod
+    def check_settings(cls, values: dict):
+        """
+        Validate runtime settings that are about to change
+        
+        Only the given names are checked, so a value from .env that isn't
+        changing can't block an unrelated update. LOT_SIZE_MODE and
+        LOT_SIZE_VALUE are checked as a pair when either one is given,
+        using the current value for the other.
+        
+        Args:
+            values: RUNTIME_SETTINGS names and their new values
+        
+        Raises:
+            ValueError: A value has the wrong type or is out of range
+        """
+        for name in values:
+            if name not in cls.RUNTIME_SETTINGS:
+                raise ValueError(f"{name} is not a runtime setting")
+        for name in ("SLIPPAGE_TOLERANCE", "TIPS_AMOUNT", "LOT_SIZE_VALUE"):
+            if name not in values:
+                continue
+            value = values[name]
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+                raise ValueError(f"{name} must be a finite number")
+        for name, (low, high) in cls.SETTING_LIMITS.items():
+            if name in values and not low <= values[name] <= high:
+                raise ValueError(f"{name} must be between {low} and {high}")
+        if "LOT_SIZE_MODE" not in values and "LOT_SIZE_VALUE" not in values:
+            return
+        mode = values.get("LOT_SIZE_MODE", cls.LOT_SIZE_MODE)
+        if mode not in cls.LOT_SIZE_LIMITS:
+            raise ValueError(f"LOT_SIZE_MODE must be one of: {', '.join(cls.LOT_SIZE_LIMITS)}")
+        high = cls.LOT_SIZE_LIMITS[mode]
+        if not 0 < values.get("LOT_SIZE_VALUE", cls.LOT_SIZE_VALUE) <= high:
+            raise ValueError(f"LOT_SIZE_VALUE must be above 0 and at most {high} in {mode} mode")
+    
+    @classmethod
+    def load_settings(cls):
+        """Apply settings saved by update_settings() on top of the .env values"""
+        try:
+            with open(cls.SETTINGS_FILE, "r") as f:
+                saved = json.load(f)
+            if not isinstance(saved, dict):
+                raise ValueError("expected a JSON object")
+            if isinstance(saved.get("LOT_SIZE_MODE"), str):
+                saved["LOT_SIZE_MODE"] = saved["LOT_SIZE_MODE"].lower()
+            cls.check_settings(saved)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"⚠️ Ignoring {cls.SETTINGS_FILE}: {e}")
+            return
+        for name, value in saved.items():
+            setattr(cls, name, value)
+    
+    @classmethod
+    def update_settings(cls, **values):
+        """
+        Change runtime settings and save them to SETTINGS_FILE
+        
+        The values are validated and saved before Config changes, so a bad
+        value or failed write leaves the current settings in place. The file
+        is written to a temporary path and renamed over the old one, so a
+        crash mid-write never leaves it truncated. Concurrent calls are
+        serialized so neither change is lost.
+        
+        Args:
+            **values: RUNTIME_SETTINGS names and their new values
+        
+        Raises:
+            ValueError: A value has the wrong type or is out of range
+        """
+        cls.check_settings(values)
+        with cls._settings_lock:
+            settings = {name: getattr(cls, name) for name in cls.RUNTIME_SETTINGS}
+            settings.update(values)
+            directory, filename = os.path.split(os.path.abspath(cls.SETTINGS_FILE))
+            fd, tmp_file = tempfile.mkstemp(prefix=filename + ".", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(settings, f, indent=2)
+                os.replace(tmp_file, cls.SETTINGS_FILE)
+            except BaseException:
+                try:
+                    os.remove(tmp_file)
+                except OSError:
+                    pass
+                raise
+            for name, value in settings.items():
+                setattr(cls, name, value)
+    
     @classmethod
     def validate(cls):
         """Validate required configuration"""
@@ -59,4 +177,8 @@ class Config:
         # Token is required for QuickNode
         if cls.YELLOWSTONE_GRPC_URL and not cls.YELLOWSTONE_GRPC_TOKEN:
             raise ValueError("YELLOWSTONE_GRPC_TOKEN is required for QuickNode Yellowstone Geyser")
+        
+        # Runtime settings from .env (or SETTINGS_FILE) must be in range
+        cls.check_settings({name: getattr(cls, name) for name in cls.RUNTIME_SETTINGS})
 
+Config.load_settings()
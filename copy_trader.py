@@ -3,6 +3,7 @@ Core copy trading logic with sub-150ms latency
 """
 import asyncio
 import time
+import traceback
 import uuid
 from datetime import datetime
 from typing import Dict, Optional, Callable
@@ -15,7 +16,7 @@ from config import Config
 from grpc_client import YellowstoneGeyserClient
 from wallet_manager import WalletManager
 from slippage_manager import SlippageManager
-from jupiter_client import JupiterClient
+from jupiter_client import get_client as get_jupiter_client
 from trade_database import TradeDatabase
 from base64 import b64decode
 
@@ -27,7 +28,7 @@ class CopyTrader:
         self.grpc_client = YellowstoneGeyserClient()
         self.wallet_manager = WalletManager()
         self.slippage_manager = SlippageManager()
-        self.jupiter_client = JupiterClient()
+        self.jupiter_client = get_jupiter_client()
         self.trade_db = TradeDatabase()
         self.trading_keypair: Optional[Keypair] = None
         self.rpc_client: Optional[AsyncClient] = None
@@ -55,8 +56,8 @@ class CopyTrader:
         # Initialize RPC client
         self.rpc_client = AsyncClient(self.config.RPC_ENDPOINT)
         
-        # Connect to Yellow Stone Geyser
-        await self.grpc_client.connect()
+        # Connect to Yellow Stone Geyser (and pre-open Jupiter connections meanwhile)
+        await asyncio.gather(self.grpc_client.connect(), self.jupiter_client.warm())
         
         print("Copy trader initialized successfully")
     
@@ -329,7 +330,6 @@ class CopyTrader:
                 
         except Exception as e:
             print(f"⚠️ Error extracting trade info: {e}")
-            import traceback
             traceback.print_exc()
             return None
     
@@ -820,7 +820,6 @@ class CopyTrader:
             return None
         except Exception as e:
             print(f"⚠️ Error extracting real trade data: {e}")
-            import traceback
             traceback.print_exc()
             return None
     
@@ -989,7 +988,6 @@ class CopyTrader:
             
         except Exception as e:
             print(f"❌ Error executing copy trade: {e}")
-            import traceback
             traceback.print_exc()
             return False
     
@@ -1074,7 +1072,6 @@ class CopyTrader:
             
         except Exception as e:
             print(f"❌ Error building swap transaction: {e}")
-            import traceback
             traceback.print_exc()
             return None
     
@@ -1128,7 +1125,6 @@ class CopyTrader:
             
         except Exception as e:
             print(f"❌ Error sending transaction: {e}")
-            import traceback
             traceback.print_exc()
             return None
     
@@ -1155,6 +1151,8 @@ class CopyTrader:
         await self.grpc_client.close()
         if self.rpc_client:
             await self.rpc_client.close()
+        await self.jupiter_client.close()
+        self.trade_db.flush()  # Write any batched trade records
         print("Copy trader stopped")
     
     def get_stats(self) -> Dict:
@@ -2,9 +2,12 @@
 Yellow Stone Geyser gRPC client for monitoring Solana transactions
 """
 import asyncio
+import traceback
 from typing import Callable, Optional
 import grpc
 from grpc import aio
+from solders.pubkey import Pubkey
+from solana.rpc.async_api import AsyncClient
 from config import Config
 
 # Import generated proto stubs
@@ -226,7 +229,6 @@ class YellowstoneGeyserClient:
                         
             except Exception as e:
                 print(f"⚠️ gRPC subscription error: {e}")
-                import traceback
                 traceback.print_exc()
                 print("⚠️ Falling back to placeholder mode")
                 await self._subscribe_fallback(account_address, callback)
@@ -237,10 +239,6 @@ class YellowstoneGeyserClient:
     
     async def _subscribe_fallback(self, account_address: str, callback: Callable):
         """Fallback subscription using RPC polling - ACTUALLY WORKS"""
-        import asyncio
-        from solders.pubkey import Pubkey
-        from solana.rpc.async_api import AsyncClient
-        
         print(f"🔄 Switching to RPC-based transaction monitoring...")
         print(f"   Master wallet: {account_address}")
         print(f"   This will check for new transactions every 5 seconds")
@@ -421,7 +419,6 @@ class YellowstoneGeyserClient:
                                                 print(f"   ✅ Callback completed successfully")
                                             except Exception as callback_error:
                                                 print(f"   ❌ Callback error: {callback_error}")
-                                                import traceback
                                                 traceback.print_exc()
                                     elif tx_info is None:
                                         print(f"⚠️ Transaction response is None for signature: {current_sig}")
@@ -432,7 +429,6 @@ class YellowstoneGeyserClient:
                                             print(f"   Response.value type: {type(tx_info.value)}")
                                 except Exception as tx_error:
                                     print(f"⚠️ Error fetching transaction details: {tx_error}")
-                                    import traceback
                                     traceback.print_exc()
                             
                             # Update last signature to the most recent one (first in original list) - OUTSIDE loop
@@ -466,7 +462,6 @@ class YellowstoneGeyserClient:
             print(f"✓ Monitoring stopped")
         except Exception as e:
             print(f"✗ Fatal error in polling: {e}")
-            import traceback
             traceback.print_exc()
         finally:
             try:
@@ -2,9 +2,16 @@
 Jupiter aggregator client for DEX swaps
 """
 import aiohttp
+from aiohttp.abc import AbstractResolver
 import asyncio
+import inspect
+import json
+import logging
+import os
+import random
 import socket
-from typing import Dict, Optional
+import time
+from typing import Dict, List, Optional, Tuple
 from solders.pubkey import Pubkey
 from config import Config
 
@@ -15,362 +22,530 @@ try:
 except ImportError:
     HTTPX_AVAILABLE = False
 
-# Try to import requests as fallback (better DNS handling on Windows)
+# HTTP/2 support in httpx needs the optional h2 package
 try:
-    import requests
-    REQUESTS_AVAILABLE = True
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
 except ImportError:
-    REQUESTS_AVAILABLE = False
+    HTTP2_AVAILABLE = False
+
+# Try to import aiodns (lets aiohttp resolve hostnames without a thread pool)
+try:
+    import aiodns
+    AIODNS_AVAILABLE = True
+except ImportError:
+    AIODNS_AVAILABLE = False
+
+# Try to import orjson (faster JSON parsing/serialization)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that never change between quote requests (already URL-encoded)
+_STATIC_QS = "onlyDirectRoutes=false&asLegacyTransaction=false"
+
+# Swap request fields that never change between calls
+_SWAP_TEMPLATE = {"wrapAndUnwrapSol": True, "asLegacyTransaction": False}
+
+# Connector options differ between aiohttp versions
+_CONNECTOR_PARAMS = inspect.signature(aiohttp.TCPConnector).parameters
+_SOCKET_FACTORY_SUPPORTED = "socket_factory" in _CONNECTOR_PARAMS  # aiohttp >= 3.10
+
+def _tuned_socket(addr_info) -> socket.socket:
+    """Create a TCP socket with Nagle disabled and a larger send buffer"""
+    family, type_, proto, _, _ = addr_info
+    sock = socket.socket(family=family, type=type_, proto=proto)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 65536)
+    return sock
+
+def _make_connector(**kwargs) -> aiohttp.TCPConnector:
+    """Create a TCPConnector whose sockets send small requests immediately"""
+    if _SOCKET_FACTORY_SUPPORTED:
+        kwargs.setdefault("socket_factory", _tuned_socket)
+    if "happy_eyeballs_delay" in _CONNECTOR_PARAMS:
+        # Race IPv4 and IPv6 connects instead of forcing IPv4
+        kwargs.setdefault("happy_eyeballs_delay", 0.25)
+    return aiohttp.TCPConnector(**kwargs)
+
+# Retry backoff bounds in seconds (decorrelated jitter)
+BACKOFF_BASE = 0.05
+BACKOFF_CAP = 1.0
+
+def _next_backoff(prev: float) -> float:
+    """Next retry delay using decorrelated jitter: uniform(base, 3 * prev), capped"""
+    return min(BACKOFF_CAP, random.uniform(BACKOFF_BASE, max(prev, BACKOFF_BASE) * 3))
+
+# Exceptions that mean the request never got a usable response
+_NETWORK_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, OSError)
+if HTTPX_AVAILABLE:
+    _NETWORK_ERRORS += (httpx.HTTPError,)
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+def _classify_error(error: BaseException) -> str:
+    """Name the failure class of a network error (for logging)"""
+    if isinstance(error, asyncio.TimeoutError) or (HTTPX_AVAILABLE and isinstance(error, httpx.TimeoutException)):
+        return "timeout"
+    if isinstance(error, socket.gaierror) or isinstance(getattr(error, "os_error", None), socket.gaierror):
+        return "DNS"
+    if isinstance(error, aiohttp.ClientConnectorError) or (HTTPX_AVAILABLE and isinstance(error, httpx.ConnectError)):
+        return "connect"
+    return "network"
+
+def _json_loads(raw: bytes):
+    """Decode a JSON response body"""
+    return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+
+def _json_dumps(obj) -> bytes:
+    """Encode a JSON request body"""
+    return orjson.dumps(obj) if ORJSON_AVAILABLE else json.dumps(obj, separators=(",", ":")).encode()
+
+class _RawQuote(dict):
+    """
+    Parsed quote that also keeps the raw response body
+    
+    The swap endpoint wants the quote back verbatim, so get_swap_transaction()
+    splices `raw` into the request body instead of re-serializing the
+    (large) routePlan. Do not mutate a quote you intend to swap with.
+    """
+    __slots__ = ("raw",)
+    
+    @classmethod
+    def from_raw(cls, raw: bytes) -> "_RawQuote":
+        quote = cls(_json_loads(raw))
+        quote.raw = raw
+        return quote
+
+class _FallbackResolver(AbstractResolver):
+    """
+    aiohttp resolver that falls back to public nameservers
+    
+    The normal resolver is tried first; if it fails, the client's parallel
+    resolver supplies the address. Only the IP is overridden, so the TLS
+    handshake still uses and verifies the original hostname.
+    """
+    
+    def __init__(self, fallback):
+        self._primary = aiohttp.AsyncResolver() if AIODNS_AVAILABLE else aiohttp.ThreadedResolver()
+        self._fallback = fallback  # async (hostname) -> Optional[str]
+    
+    async def resolve(self, host: str, port: int = 0, family: int = socket.AF_INET):
+        try:
+            return await self._primary.resolve(host, port, family)
+        except OSError:
+            ip_address = await self._fallback(host)
+            if not ip_address:
+                raise
+            logger.warning("DNS lookup failed for %s, using fallback address %s", host, ip_address)
+            return [{
+                "hostname": host,
+                "host": ip_address,
+                "port": port,
+                "family": socket.AF_INET,
+                "proto": 0,
+                "flags": socket.AI_NUMERICHOST,
+            }]
+    
+    async def close(self):
+        await self._primary.close()
 
 class JupiterClient:
     """Client for Jupiter aggregator API"""
     
-    BASE_URL = "https://quote-api.jup.ag/v6"
-    SWAP_URL = "https://quote-api.jup.ag/v6/swap"
+    # Public endpoint (used when JUPITER_BASE_URL is not configured)
+    DEFAULT_BASE_URL = "https://quote-api.jup.ag/v6"
+    
+    # Public resolvers raced against each other when the system DNS fails
+    DNS_NAMESERVERS = ("8.8.8.8", "1.1.1.1", "9.9.9.9")
+    # DNS-over-HTTPS endpoints, addressed by IP so they work when DNS itself is broken
+    DOH_RESOLVERS = (
+        ("google", "https://8.8.8.8/resolve"),
+        ("cloudflare", "https://1.1.1.1/dns-query"),
+    )
+    DNS_TIMEOUT = 2.0  # seconds
+    DNS_CACHE_TTL = 300  # seconds
+    DNS_CACHE_FILE = os.path.expanduser("~/.jupiter_dns_cache.json")  # Survives restarts
     
-    # Hardcoded IP addresses for quote-api.jup.ag (fallback if DNS fails)
-    # These are Cloudflare IPs that host the domain
-    JUPITER_API_IPS = [
-        "104.21.0.0",  # Cloudflare IP range
-        "172.67.0.0",  # Cloudflare IP range
-    ]
+    QUOTE_HEDGE_TIMEOUT = 5.0  # seconds to wait for the fastest quote transport
+    QUOTE_CACHE_MAX = 256  # entries before expired quotes are pruned
+    MAX_CONCURRENT_REQUESTS = 20  # in-flight requests, kept under limit_per_host
     
     # Known token addresses (SOL on testnet/mainnet)
     SOL_MINT_MAINNET = "So11111111111111111111111111111111111111112"
     SOL_MINT_TESTNET = "So11111111111111111111111111111111111111112"  # Same on testnet
     
-    def __init__(self):
+    def __init__(self, cache_ttl: float = 0.5, bucket: int = 1):
+        """
+        Args:
+            cache_ttl: Seconds a successful quote is reused (0 disables caching)
+            bucket: Amounts within the same bucket share a cached quote. The
+                default of 1 only reuses quotes for the exact same amount,
+                since the quoted amount is what gets swapped.
+        """
         self.config = Config
-        self._resolved_ip = None  # Cache resolved IP address
+        self._dns_cache: Dict[str, Tuple[str, float]] = {}  # hostname -> (ip, expiry)
+        self._dns_resolvers = None  # aiodns resolvers, created on first use
+        self._load_dns_cache()
+        
+        # Endpoints are configurable so a higher rate-limit tier can be used
+        self.base_url = (Config.JUPITER_BASE_URL or self.DEFAULT_BASE_URL).rstrip("/")
+        self.quote_url = f"{self.base_url}/quote"
+        self.swap_url = Config.JUPITER_SWAP_URL or f"{self.base_url}/swap"
+        self._headers = {"x-api-key": Config.JUPITER_API_KEY} if Config.JUPITER_API_KEY else {}
+        self._pk_str_cache: Dict[Pubkey, str] = {}  # Pubkey -> base58 string
+        self._sol_mint = self.SOL_MINT_TESTNET if Config.NETWORK == "testnet" else self.SOL_MINT_MAINNET
+        self._session: Optional[aiohttp.ClientSession] = None  # Shared keep-alive session
+        self._httpx_client = None  # Shared httpx.AsyncClient, created on first use
+        self._doh_client = None  # httpx.AsyncClient for DoH lookups, without the Jupiter headers
+        self.cache_ttl = cache_ttl
+        self.bucket = max(1, bucket)
+        self._quote_cache: Dict[tuple, Tuple[float, Dict]] = {}  # key -> (fetched at, quote)
+        self._request_slots = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
     
-    def _resolve_dns(self, hostname: str) -> Optional[str]:
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            connector = _make_connector(
+                limit=100,
+                limit_per_host=30,
+                ttl_dns_cache=300,
+                use_dns_cache=True,
+                keepalive_timeout=60,
+                resolver=_FallbackResolver(self._resolve_dns_async),
+            )
+            timeout = aiohttp.ClientTimeout(total=15, connect=10)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout, headers=self._headers)
+        return self._session
+    
+    def _get_httpx_client(self):
+        """Get the shared httpx client, creating it on first use"""
+        if self._httpx_client is None or self._httpx_client.is_closed:
+            self._httpx_client = httpx.AsyncClient(
+                timeout=15.0,
+                headers=self._headers,
+                limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60),
+                http2=HTTP2_AVAILABLE,  # Quote and swap share one multiplexed connection
+            )
+        return self._httpx_client
+    
+    def _get_doh_client(self):
+        """Get the DNS-over-HTTPS client; separate so the Jupiter API key never goes to a resolver"""
+        if self._doh_client is None or self._doh_client.is_closed:
+            self._doh_client = httpx.AsyncClient(timeout=self.DNS_TIMEOUT)
+        return self._doh_client
+    
+    async def close(self):
+        """Close the shared HTTP clients"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self._httpx_client is not None:
+            await self._httpx_client.aclose()
+            self._httpx_client = None
+        if self._doh_client is not None:
+            await self._doh_client.aclose()
+            self._doh_client = None
+    
+    async def warm(self):
         """
-        Manually resolve DNS using nslookup (workaround for Windows DNS issues)
+        Open connections to Jupiter ahead of the first quote
         
-        Args:
-            hostname: Hostname to resolve
-            
-        Returns:
-            IP address or None if failed
+        Resolves DNS and completes the TCP+TLS handshake so the first real
+        quote reuses a live keep-alive connection. Failures are ignored.
         """
-        try:
-            # First try: Use socket.getaddrinfo
-            result = socket.getaddrinfo(hostname, 443, socket.AF_INET, socket.SOCK_STREAM)
-            if result:
-                ip_address = result[0][4][0]
-                print(f"✓ DNS resolved (socket): {hostname} -> {ip_address}")
-                return ip_address
-        except Exception:
-            pass
+        async def warm_aiohttp():
+            session = await self._get_session()
+            async with session.head(self.base_url, allow_redirects=False):
+                pass
         
-        # Fallback 1: Try using dig command (Linux servers - most reliable)
+        warmers = [warm_aiohttp()]
+        if HTTPX_AVAILABLE:
+            warmers.append(self._get_httpx_client().head(self.base_url))
+        for result in await asyncio.gather(*warmers, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.debug("Jupiter connection warm-up failed: %s", result)
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    def _load_dns_cache(self):
+        """Load unexpired DNS answers saved by a previous run"""
+        now = time.time()
         try:
-            import subprocess
-            import os
-            # Use dig if available (Linux)
-            dig_paths = ['/usr/bin/dig', '/bin/dig', 'dig']  # Try multiple paths
-            dig_cmd = None
-            for path in dig_paths:
-                if path == 'dig' or os.path.exists(path):
-                    dig_cmd = path
-                    break
-            
-            if dig_cmd:
-                result = subprocess.run(
-                    [dig_cmd, '+short', hostname, '@8.8.8.8'],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                if result.returncode == 0 and result.stdout.strip():
-                    lines = result.stdout.strip().split('\n')
-                    for line in lines:
-                        ip = line.strip()
-                        # Validate IP (must be IPv4)
-                        if ip and ip.count('.') == 3 and not ip.startswith(';'):
-                            try:
-                                socket.inet_aton(ip)
-                                print(f"✓ DNS resolved (dig): {hostname} -> {ip}")
-                                return ip
-                            except:
-                                continue
-                else:
-                    print(f"⚠️ dig returned: returncode={result.returncode}, stdout={result.stdout[:100]}, stderr={result.stderr[:100]}")
-        except FileNotFoundError:
-            print(f"⚠️ dig command not found")
-        except Exception as e:
-            print(f"⚠️ dig command failed: {e}")
-            import traceback
-            traceback.print_exc()
-        
-        # Fallback 2: Try using DNS over HTTPS (Google)
+            with open(self.DNS_CACHE_FILE, 'r') as f:
+                saved = json.load(f)
+            entries = {}
+            for hostname, (ip_address, expires_at) in saved.items():
+                if isinstance(ip_address, str) and expires_at > now:
+                    entries[hostname] = (ip_address, time.monotonic() + (expires_at - now))
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            # Missing or malformed file: start with an empty cache
+            logger.debug("Could not load DNS cache: %s", e)
+            return
+        self._dns_cache.update(entries)
+    
+    def _save_dns_cache(self):
+        """Save DNS answers with wall-clock expiry so a restart can reuse them"""
+        offset = time.time() - time.monotonic()
+        saved = {
+            hostname: [ip_address, expiry + offset]
+            for hostname, (ip_address, expiry) in self._dns_cache.items()
+        }
         try:
-            import json
-            import urllib.request
-            # Use Google's DNS over HTTPS
-            doh_url = f"https://dns.google/resolve?name={hostname}&type=A"
-            req = urllib.request.Request(doh_url, headers={'Accept': 'application/json'})
-            with urllib.request.urlopen(req, timeout=10) as response:
-                data = json.loads(response.read())
-                # Google DoH uses 'Answer' field
-                if 'Answer' in data and len(data['Answer']) > 0:
-                    for answer in data['Answer']:
-                        if answer.get('type') == 1:  # A record
-                            ip_address = answer.get('data', '').strip()
-                            if ip_address:
-                                try:
-                                    socket.inet_aton(ip_address)
-                                    print(f"✓ DNS resolved (Google DoH): {hostname} -> {ip_address}")
-                                    return ip_address
-                                except:
-                                    continue
+            with open(self.DNS_CACHE_FILE, 'w') as f:
+                json.dump(saved, f)
+        except OSError as e:
+            logger.debug("Could not save DNS cache: %s", e)
+    
+    async def _query_nameserver(self, resolver, hostname: str) -> Optional[str]:
+        """Ask a single resolver for an IPv4 address of hostname"""
+        try:
+            if resolver is None:
+                # No aiodns: use the loop's (threaded) system resolver
+                loop = asyncio.get_running_loop()
+                result = await loop.getaddrinfo(hostname, 443, family=socket.AF_INET, type=socket.SOCK_STREAM)
+                return result[0][4][0] if result else None
+            result = await resolver.gethostbyname(hostname, socket.AF_INET)
+            return result.addresses[0] if result.addresses else None
         except Exception as e:
-            print(f"⚠️ Google DoH failed: {e}")
-        
-        # Fallback 2: Try Cloudflare DoH
+            logger.debug("DNS query for %s failed: %s", hostname, e)
+            return None
+    
+    async def _query_doh(self, doh_url: str, hostname: str) -> Optional[str]:
+        """Ask a DNS-over-HTTPS endpoint for an IPv4 address of hostname"""
         try:
-            import json
-            import urllib.request
-            doh_url = f"https://cloudflare-dns.com/dns-query?name={hostname}&type=A"
-            req = urllib.request.Request(doh_url, headers={'Accept': 'application/dns-json'})
-            with urllib.request.urlopen(req, timeout=10) as response:
-                data = json.loads(response.read())
-                if 'Answer' in data and len(data['Answer']) > 0:
-                    for answer in data['Answer']:
-                        if answer.get('type') == 1:  # A record
-                            ip_address = answer.get('data', '').strip()
-                            if ip_address:
-                                try:
-                                    socket.inet_aton(ip_address)
-                                    print(f"✓ DNS resolved (Cloudflare DoH): {hostname} -> {ip_address}")
-                                    return ip_address
-                                except:
-                                    continue
+            response = await self._get_doh_client().get(
+                doh_url,
+                params={"name": hostname, "type": "A"},
+                headers={"Accept": "application/dns-json"},
+            )
+            for answer in _json_loads(response.content).get("Answer", []):
+                if answer.get("type") == 1:  # A record
+                    return answer.get("data", "").strip() or None
         except Exception as e:
-            print(f"⚠️ Cloudflare DoH failed: {e}")
+            logger.debug("DoH query to %s for %s failed: %s", doh_url, hostname, e)
+        return None
+    
+    async def _resolve_dns_async(self, hostname: str) -> Optional[str]:
+        """
+        Resolve hostname without blocking the event loop
         
-        # Fallback 3: Use requests library (better DNS handling on Windows)
-        if REQUESTS_AVAILABLE:
-            try:
-                import requests
-                # requests library uses system DNS which might work better
-                response = requests.get(f"https://{hostname}", timeout=5, allow_redirects=False)
-                # Extract IP from connection
-                if hasattr(response.raw, '_connection') and hasattr(response.raw._connection, 'sock'):
-                    sock = response.raw._connection.sock
-                    if sock:
-                        peer = sock.getpeername()
-                        if peer:
-                            ip_address = peer[0]
-                            print(f"✓ DNS resolved (requests): {hostname} -> {ip_address}")
-                            return ip_address
-            except Exception as e:
-                print(f"⚠️ requests DNS resolution failed: {e}")
+        Queries several public nameservers (plain DNS and DNS-over-HTTPS) in
+        parallel and takes the first answer. Results are cached for
+        DNS_CACHE_TTL seconds.
         
-        # Fallback 4: Try host command (Linux - more common than dig)
-        try:
-            import subprocess
-            import os
-            host_paths = ['/usr/bin/host', '/bin/host', 'host']
-            host_cmd = None
-            for path in host_paths:
-                if path == 'host' or os.path.exists(path):
-                    host_cmd = path
-                    break
+        Args:
+            hostname: Hostname to resolve
             
-            if host_cmd:
-                result = subprocess.run(
-                    [host_cmd, hostname, '8.8.8.8'],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                if result.returncode == 0 and result.stdout.strip():
-                    import re
-                    ip_pattern = r'\b(?:\d{1,3}\.){3}\d{1,3}\b'
-                    ips = re.findall(ip_pattern, result.stdout)
-                    for ip in ips:
-                        if ip != '8.8.8.8' and ip:
-                            try:
-                                socket.inet_aton(ip)
-                                print(f"✓ DNS resolved (host): {hostname} -> {ip}")
-                                return ip
-                            except:
-                                continue
-        except Exception as e:
-            print(f"⚠️ host command failed: {e}")
+        Returns:
+            IP address or None if failed
+        """
+        cached = self._dns_cache.get(hostname)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
         
-        # Fallback 5: Try getent (Linux - uses /etc/hosts and DNS)
+        if AIODNS_AVAILABLE:
+            if self._dns_resolvers is None:
+                self._dns_resolvers = [aiodns.DNSResolver(nameservers=[ns]) for ns in self.DNS_NAMESERVERS]
+            resolvers = self._dns_resolvers
+        else:
+            resolvers = [None]
+        
+        queries = [self._query_nameserver(r, hostname) for r in resolvers]
+        if HTTPX_AVAILABLE:
+            queries += [self._query_doh(doh_url, hostname) for _, doh_url in self.DOH_RESOLVERS]
+        pending = {asyncio.ensure_future(query) for query in queries}
+        deadline = time.monotonic() + self.DNS_TIMEOUT
+        ip_address = None
         try:
-            import subprocess
-            result = subprocess.run(
-                ['getent', 'hosts', hostname],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if result.returncode == 0 and result.stdout.strip():
-                ip = result.stdout.strip().split()[0]
-                if ip and ip.count('.') == 3:
-                    try:
-                        socket.inet_aton(ip)
-                        print(f"✓ DNS resolved (getent): {hostname} -> {ip}")
-                        return ip
-                    except:
-                        pass
-        except Exception as e:
-            print(f"⚠️ getent command failed: {e}")
+            while pending and ip_address is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.result():
+                        ip_address = task.result()
+                        break
+        finally:
+            for task in pending:
+                task.cancel()
         
-        # Final fallback: Return None
-        print(f"❌ All DNS resolution methods failed for {hostname}")
-        print(f"   Tried: socket.getaddrinfo, dig, Google DoH, Cloudflare DoH, requests, host, getent")
-        return None
+        if ip_address:
+            self._dns_cache[hostname] = (ip_address, time.monotonic() + self.DNS_CACHE_TTL)
+            self._save_dns_cache()
+            logger.debug("DNS resolved: %s -> %s", hostname, ip_address)
+        else:
+            logger.error("All DNS resolvers failed for %s", hostname)
+        return ip_address
+    
+    def _build_quote_url(self, input_mint: str, output_mint: str, amount: int, slippage_bps: int) -> str:
+        """
+        Build the fully-encoded /quote URL
+        
+        Mint addresses are base58 and amounts are integers, so none of the
+        values need escaping and aiohttp's params encoding can be skipped.
+        """
+        return (
+            f"{self.quote_url}?inputMint={input_mint}&outputMint={output_mint}"
+            f"&amount={amount}&slippageBps={slippage_bps}&{_STATIC_QS}"
+        )
     
-    async def _get_quote_with_requests(self, url: str, params: Dict) -> Optional[Dict]:
+    async def _send_aiohttp(self, method: str, url: str, data: Optional[bytes] = None) -> Tuple[int, bytes]:
         """
-        Get quote using requests library (better DNS handling on Windows)
+        Send a request using the shared aiohttp session
+        
+        DNS failures are handled by the session's resolver (see
+        _FallbackResolver), so TLS is always verified against the real hostname.
+        
+        Returns:
+            (status code, response body)
         """
-        if not REQUESTS_AVAILABLE:
-            return None
+        session = await self._get_session()
+        headers = _JSON_HEADERS if data is not None else None
+        async with session.request(method, url, data=data, headers=headers) as response:
+            return response.status, await response.read()
+    
+    async def _send_httpx(self, method: str, url: str, data: Optional[bytes] = None) -> Tuple[int, bytes]:
+        """Send a request using httpx (independent connection pool and DNS path)"""
+        headers = _JSON_HEADERS if data is not None else None
+        response = await self._get_httpx_client().request(method, url, content=data, headers=headers)
+        logger.debug("Jupiter %s via httpx negotiated %s", method, response.http_version)
+        return response.status_code, response.content
+    
+    async def _send_hedged(self, method: str, url: str) -> Tuple[int, bytes]:
+        """
+        Race an idempotent request over aiohttp and httpx
+        
+        Both transports are started together and the first 200 response wins;
+        the slower request is cancelled. If neither returns 200, the first
+        error response is returned so the caller can classify it.
         
+        Raises:
+            The first transport error if no transport produced a response
+            asyncio.TimeoutError if nothing finished within QUOTE_HEDGE_TIMEOUT
+        """
+        pending = {asyncio.ensure_future(self._send_aiohttp(method, url))}
+        if HTTPX_AVAILABLE:
+            pending.add(asyncio.ensure_future(self._send_httpx(method, url)))
+        
+        deadline = time.monotonic() + self.QUOTE_HEDGE_TIMEOUT
+        first_error = None
+        first_response = None
         try:
-            import requests
-            # Run in executor to avoid blocking
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: requests.get(url, params=params, timeout=15)
-            )
-            if response.status_code == 200:
-                print(f"✓ Quote received via requests library")
-                return response.json()
-            else:
-                print(f"❌ Jupiter quote error: {response.status_code} - {response.text}")
-                return None
-        except Exception as e:
-            print(f"⚠️ requests library failed: {e}")
-            return None
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError(f"Jupiter {method} timed out on all transports")
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        first_error = first_error or task.exception()
+                    elif task.result()[0] == 200:
+                        return task.result()
+                    else:
+                        first_response = first_response or task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        if first_response is not None:
+            return first_response
+        raise first_error
     
-    async def _get_quote_with_fallback(self, url: str, params: Dict) -> Optional[Dict]:
+    async def _send(self, method: str, url: str, data: Optional[bytes] = None) -> Tuple[int, bytes]:
+        """Send one request attempt over the best available transport"""
+        if method == "GET":
+            return await self._send_hedged(method, url)
+        try:
+            return await self._send_aiohttp(method, url, data)
+        except aiohttp.ClientConnectorError as e:
+            if not HTTPX_AVAILABLE:
+                raise
+            # httpx has its own DNS path, worth one try before backing off
+            logger.debug("aiohttp could not connect for %s (%s), trying httpx", method, e)
+            return await self._send_httpx(method, url, data)
+    
+    async def _request_with_retry(
+        self,
+        method: str,
+        url: str,
+        *,
+        data: Optional[bytes] = None,
+        max_retries: int = 3  # Quotes go stale quickly, fail fast instead
+    ) -> Optional[bytes]:
         """
-        Get quote using aiohttp with IP address fallback if DNS fails
+        Send a request to Jupiter, retrying transient failures
+        
+        DNS, connect and timeout errors as well as 429/5xx responses are
+        retried with jittered backoff. Other 4xx responses are not retried.
+        At most MAX_CONCURRENT_REQUESTS attempts are in flight at once.
         
         Args:
-            url: Full URL to request
-            params: Query parameters
+            method: HTTP method ("GET" or "POST")
+            url: Full request URL
+            data: Encoded JSON body for POST requests
+            max_retries: Maximum number of attempts
             
         Returns:
-            Response JSON or None if failed
+            Response body of the first 200 response, or None if failed
         """
-        from urllib.parse import urlparse
-        parsed = urlparse(url)
-        hostname = parsed.hostname
-        
-        # First try: Use aiohttp with hostname
-        try:
-            connector = aiohttp.TCPConnector(
-                limit=100,
-                limit_per_host=30,
-                ttl_dns_cache=0,
-                use_dns_cache=False,
-                force_close=True,
-                family=socket.AF_INET,
-            )
-            timeout = aiohttp.ClientTimeout(total=15, connect=10)
+        wait_time = 0.0
+        reason = None
+        for attempt in range(max_retries):
+            try:
+                # Only the attempt holds a slot, not the backoff sleep
+                async with self._request_slots:
+                    status, body = await self._send(method, url, data)
+                if status == 200:
+                    return body
+                if logger.isEnabledFor(logging.WARNING):
+                    logger.warning("Jupiter %s error %s: %s", method, status, body[:500].decode(errors="replace"))
+                if status != 429 and status < 500:
+                    return None  # Rejected request, retrying will not help
+                reason = f"HTTP {status}"
+            except _NETWORK_ERRORS as e:
+                reason = f"{_classify_error(e)} error: {e}"
             
-            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        error_text = await response.text()
-                        print(f"❌ Jupiter quote error: {response.status} - {error_text}")
-                        return None
-        except Exception as e:
-            error_str = str(e)
-            if "getaddrinfo failed" in error_str or "Name resolution failed" in error_str or "11001" in error_str:
-                # Fallback: Resolve DNS manually and use IP address
-                print(f"⚠️ aiohttp DNS failed, trying manual DNS resolution...")
-                ip_address = self._resolve_dns(hostname)
-                
-                if ip_address:
-                    # Use IP address with Host header for SSL
-                    url_with_ip = url.replace(hostname, ip_address)
-                    headers = {'Host': hostname}  # Important for SSL certificate validation
-                    
-                    try:
-                        connector = aiohttp.TCPConnector(
-                            limit=100,
-                            limit_per_host=30,
-                            ttl_dns_cache=0,
-                            use_dns_cache=False,
-                            force_close=True,
-                            family=socket.AF_INET,
-                        )
-                        timeout = aiohttp.ClientTimeout(total=15, connect=10)
-                        
-                        # Create SSL context that doesn't verify hostname (since we're using IP)
-                        import ssl
-                        ssl_context = ssl.create_default_context()
-                        ssl_context.check_hostname = False
-                        ssl_context.verify_mode = ssl.CERT_NONE
-                        
-                        # Update connector with SSL context
-                        connector = aiohttp.TCPConnector(
-                            limit=100,
-                            limit_per_host=30,
-                            ttl_dns_cache=0,
-                            use_dns_cache=False,
-                            force_close=True,
-                            family=socket.AF_INET,
-                            ssl=ssl_context
-                        )
-                        
-                        async with aiohttp.ClientSession(
-                            connector=connector,
-                            timeout=timeout
-                        ) as session:
-                            async with session.get(
-                                url_with_ip,
-                                params=params,
-                                headers=headers
-                            ) as response:
-                                if response.status == 200:
-                                    print(f"✓ Successfully connected using IP address")
-                                    return await response.json()
-                                else:
-                                    error_text = await response.text()
-                                    print(f"❌ Jupiter quote error (IP): {response.status} - {error_text}")
-                                    return None
-                    except Exception as ip_error:
-                        print(f"❌ IP address connection failed: {ip_error}")
-                        # Final fallback: Try httpx
-                        if HTTPX_AVAILABLE:
-                            print(f"⚠️ Trying httpx as final fallback...")
-                            try:
-                                async with httpx.AsyncClient(timeout=15.0) as client:
-                                    response = await client.get(url, params=params)
-                                    if response.status_code == 200:
-                                        print(f"✓ httpx fallback succeeded")
-                                        return response.json()
-                                    else:
-                                        print(f"❌ httpx error: {response.status_code}")
-                                        return None
-                            except Exception as httpx_error:
-                                print(f"❌ httpx fallback also failed: {httpx_error}")
-                                return None
-                        return None
-                else:
-                    print(f"❌ Could not resolve DNS for {hostname}")
-                    return None
-            else:
-                raise  # Re-raise if it's a different error
+            if attempt < max_retries - 1:
+                wait_time = _next_backoff(wait_time)
+                logger.debug("Jupiter %s failed (attempt %d/%d, %s), retrying in %.2fs", method, attempt + 1, max_retries, reason, wait_time)
+                await asyncio.sleep(wait_time)
         
+        logger.error("Jupiter %s failed after %d attempts: %s", method, max_retries, reason)
+        if reason.startswith("DNS"):
+            logger.error("Check internet connection, DNS server, firewall, or Jupiter API status")
+        return None
+    
+    def _pk(self, pubkey: Pubkey) -> str:
+        """Get base58 string for a public key (cached, encoding is not free)"""
+        pk_str = self._pk_str_cache.get(pubkey)
+        if pk_str is None:
+            pk_str = str(pubkey)
+            self._pk_str_cache[pubkey] = pk_str
+        return pk_str
+    
+    def _store_quote(self, cache_key: tuple, quote: Dict):
+        """Cache a quote, dropping expired entries once the cache grows"""
+        now = time.monotonic()
+        if len(self._quote_cache) >= self.QUOTE_CACHE_MAX:
+            self._quote_cache = {
+                key: entry for key, entry in self._quote_cache.items()
+                if now - entry[0] < self.cache_ttl
+            }
+        self._quote_cache[cache_key] = (now, quote)
+    
     def get_sol_mint(self) -> str:
         """Get SOL mint address based on network"""
-        if self.config.NETWORK == "testnet":
-            return self.SOL_MINT_TESTNET
-        return self.SOL_MINT_MAINNET
+        return self._sol_mint
     
     async def get_quote(
         self,
@@ -382,6 +557,9 @@ class JupiterClient:
         """
         Get swap quote from Jupiter
         
+        Successful quotes are reused for cache_ttl seconds, so callers must
+        treat the returned dictionary as read-only.
+        
         Args:
             input_mint: Input token mint address
             output_mint: Output token mint address
@@ -391,106 +569,39 @@ class JupiterClient:
         Returns:
             Quote dictionary or None if failed
         """
+        cache_key = (input_mint, output_mint, amount // self.bucket, slippage_bps)
+        cached = self._quote_cache.get(cache_key)
+        if cached is not None and time.monotonic() - cached[0] < self.cache_ttl:
+            return cached[1]
+        
         try:
-            # Retry logic for network issues
-            max_retries = 5  # Increased retries
-            
-            for attempt in range(max_retries):
-                try:
-                    params = {
-                        "inputMint": input_mint,
-                        "outputMint": output_mint,
-                        "amount": str(amount),
-                        "slippageBps": str(slippage_bps),
-                    }
-                    
-                    url = f"{self.BASE_URL}/quote"
-                    
-                    # First try: Use requests library (better DNS on Windows)
-                    if REQUESTS_AVAILABLE and attempt == 0:
-                        quote = await self._get_quote_with_requests(url, params)
-                        if quote:
-                            return quote
-                    
-                    # Fallback: Use aiohttp with DNS resolution
-                    quote = await self._get_quote_with_fallback(url, params)
-                    
-                    if quote:
-                        return quote
-                    else:
-                        if attempt < max_retries - 1:
-                            wait_time = 2 ** attempt
-                            print(f"⚠️ Quote request failed (attempt {attempt+1}/{max_retries}), retrying in {wait_time}s...")
-                            await asyncio.sleep(wait_time)
-                            continue
-                        return None
-                except (aiohttp.ClientConnectorError, aiohttp.ClientError) as e:
-                    # Clean up connector on error (session is already closed by context manager)
-                    try:
-                        if 'connector' in locals():
-                            await connector.close()
-                    except:
-                        pass
-                    error_str = str(e)
-                    if "getaddrinfo failed" in error_str or "Name resolution failed" in error_str:
-                        if attempt < max_retries - 1:
-                            wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s, 8s, 16s
-                            print(f"⚠️ DNS resolution failed (attempt {attempt+1}/{max_retries}): {e}")
-                            print(f"   Retrying in {wait_time}s...")
-                            await asyncio.sleep(wait_time)
-                            continue
-                        else:
-                            print(f"❌ DNS resolution failed after {max_retries} attempts")
-                            print(f"   Error: {e}")
-                            print(f"   Possible causes:")
-                            print(f"   1. No internet connection")
-                            print(f"   2. DNS server issue")
-                            print(f"   3. Firewall blocking quote-api.jup.ag")
-                            print(f"   4. Jupiter API temporarily down")
-                            return None
-                    elif attempt < max_retries - 1:
-                        wait_time = 2 ** attempt
-                        print(f"⚠️ Network error (attempt {attempt+1}/{max_retries}): {e}, retrying in {wait_time}s...")
-                        await asyncio.sleep(wait_time)
-                        continue
-                    else:
-                        print(f"❌ Error getting Jupiter quote after {max_retries} attempts: {e}")
-                        return None
-                except asyncio.TimeoutError as e:
-                    # Clean up connector on timeout (session is already closed by context manager)
-                    try:
-                        if 'connector' in locals():
-                            await connector.close()
-                    except:
-                        pass
-                    if attempt < max_retries - 1:
-                        wait_time = 2 ** attempt
-                        print(f"⚠️ Timeout error (attempt {attempt+1}/{max_retries}): {e}, retrying in {wait_time}s...")
-                        await asyncio.sleep(wait_time)
-                        continue
-                    else:
-                        print(f"❌ Timeout getting Jupiter quote after {max_retries} attempts")
-                        return None
-                except RuntimeError as e:
-                    # Handle "Session is closed" error
-                    if "Session is closed" in str(e):
-                        if attempt < max_retries - 1:
-                            wait_time = 2 ** attempt
-                            print(f"⚠️ Session closed error (attempt {attempt+1}/{max_retries}), retrying in {wait_time}s...")
-                            await asyncio.sleep(wait_time)
-                            continue
-                        else:
-                            print(f"❌ Session closed error after {max_retries} attempts")
-                            return None
-                    else:
-                        raise  # Re-raise if it's a different RuntimeError
-                        
+            url = self._build_quote_url(input_mint, output_mint, amount, slippage_bps)
+            raw = await self._request_with_retry("GET", url)
+            if raw is None:
+                return None
+            quote = _RawQuote.from_raw(raw)
+            if self.cache_ttl > 0:
+                self._store_quote(cache_key, quote)
+            return quote
         except Exception as e:
-            print(f"❌ Unexpected error getting Jupiter quote: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Unexpected error getting Jupiter quote: %s", e)
             return None
     
+    async def get_quotes_batch(
+        self,
+        quote_requests: List[Tuple[str, str, int, int]]
+    ) -> List[Optional[Dict]]:
+        """
+        Get several swap quotes concurrently
+        
+        Args:
+            quote_requests: List of (input_mint, output_mint, amount, slippage_bps)
+            
+        Returns:
+            List of quote dictionaries (None for failed quotes), in request order
+        """
+        return await asyncio.gather(*(self.get_quote(*request) for request in quote_requests))
+    
     async def get_swap_transaction(
         self,
         quote: Dict,
@@ -512,89 +623,37 @@ class JupiterClient:
         """
         try:
             swap_request = {
-                "quoteResponse": quote,
-                "userPublicKey": str(user_public_key),
-                "wrapAndUnwrapSol": True,
+                **_SWAP_TEMPLATE,
+                "userPublicKey": self._pk(user_public_key),
                 "dynamicComputeUnitLimit": dynamic_compute_unit_limit,
                 "prioritizationFeeLamports": priority_fee_lamports
             }
             
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    # Try aiohttp first
-                    connector = aiohttp.TCPConnector(
-                        limit=100,
-                        limit_per_host=30,
-                        ttl_dns_cache=0,
-                        use_dns_cache=False,
-                        force_close=True,
-                        family=socket.AF_INET,
-                    )
-                    timeout = aiohttp.ClientTimeout(total=15, connect=10)
-                    
-                    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                        async with session.post(self.SWAP_URL, json=swap_request) as response:
-                            if response.status == 200:
-                                swap_data = await response.json()
-                                return swap_data
-                            else:
-                                error_text = await response.text()
-                                print(f"❌ Jupiter swap error: {response.status} - {error_text}")
-                                if attempt < max_retries - 1:
-                                    await asyncio.sleep(1)
-                                    continue
-                                return None
-                except Exception as e:
-                    error_str = str(e)
-                    if "getaddrinfo failed" in error_str and HTTPX_AVAILABLE:
-                        # Fallback to httpx (better DNS handling)
-                        print(f"⚠️ aiohttp DNS failed for swap, trying httpx fallback...")
-                        try:
-                            async with httpx.AsyncClient(timeout=15.0) as client:
-                                response = await client.post(self.SWAP_URL, json=swap_request)
-                                if response.status_code == 200:
-                                    print(f"✓ httpx fallback succeeded for swap")
-                                    return response.json()
-                                else:
-                                    print(f"❌ httpx swap error: {response.status_code}")
-                                    if attempt < max_retries - 1:
-                                        await asyncio.sleep(1)
-                                        continue
-                                    return None
-                        except Exception as httpx_error:
-                            print(f"❌ httpx fallback also failed: {httpx_error}")
-                            if attempt < max_retries - 1:
-                                await asyncio.sleep(1)
-                                continue
-                            return None
-                    else:
-                        if attempt < max_retries - 1:
-                            wait_time = 2 ** attempt
-                            print(f"⚠️ Network error getting swap (attempt {attempt+1}/{max_retries}): {e}, retrying in {wait_time}s...")
-                            await asyncio.sleep(wait_time)
-                            continue
-                        else:
-                            raise
-                except (aiohttp.ClientConnectorError, aiohttp.ClientError, asyncio.TimeoutError, RuntimeError) as e:
-                    # Clean up connector on error (session is already closed by context manager)
-                    try:
-                        if 'connector' in locals():
-                            await connector.close()
-                    except:
-                        pass
-                    if attempt < max_retries - 1:
-                        wait_time = 2 ** attempt
-                        print(f"⚠️ Network error getting swap (attempt {attempt+1}/{max_retries}): {e}, retrying in {wait_time}s...")
-                        await asyncio.sleep(wait_time)
-                        continue
-                    else:
-                        print(f"❌ Error getting Jupiter swap after {max_retries} attempts: {e}")
-                        return None
-                        
+            # Forward the quote verbatim when we still have its raw bytes
+            raw_quote = getattr(quote, "raw", None)
+            if raw_quote is not None:
+                body = b'{"quoteResponse":' + raw_quote + b"," + _json_dumps(swap_request)[1:]
+            else:
+                body = _json_dumps({"quoteResponse": quote, **swap_request})
+            
+            raw = await self._request_with_retry("POST", self.swap_url, data=body)
+            return _json_loads(raw) if raw is not None else None
         except Exception as e:
-            print(f"❌ Unexpected error getting Jupiter swap: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Unexpected error getting Jupiter swap: %s", e)
             return None
 
+
+# Shared client instance (see get_client)
+_default_client: Optional[JupiterClient] = None
+
+def get_client() -> JupiterClient:
+    """
+    Get the process-wide JupiterClient
+    
+    Every consumer should share one client so connections and caches are
+    reused instead of being rebuilt per caller.
+    """
+    global _default_client
+    if _default_client is None:
+        _default_client = JupiterClient()
+    return _default_client
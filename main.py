@@ -5,6 +5,7 @@ import asyncio
 import os
 import signal
 import sys
+import traceback
 
 from config import Config
 from copy_trader import CopyTrader
@@ -12,6 +13,7 @@ from copy_trader import CopyTrader
 # Global instances
 copy_trader: CopyTrader = None
 telegram_monitor = None
+stop_event: asyncio.Event = None  # Set to request shutdown
 
 # Try to import Telegram bot (optional)
 try:
@@ -20,74 +22,184 @@ try:
 except ImportError:
     TELEGRAM_AVAILABLE = False
 
-def signal_handler(sig, frame):
-    """Handle shutdown signals"""
-    print("\nShutting down copy trading bot...")
-    if copy_trader:
-        asyncio.create_task(copy_trader.stop())
-    sys.exit(0)
+def _request_shutdown(sig: signal.Signals):
+    """Handle shutdown signals (runs on the event loop)"""
+    print(f"\nReceived {sig.name}, shutting down copy trading bot...")
+    stop_event.set()
+
+def _install_signal_handlers(loop: asyncio.AbstractEventLoop):
+    """Route SIGINT/SIGTERM to _request_shutdown on the event loop"""
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, _request_shutdown, sig)
+        except NotImplementedError:
+            # Windows event loops have no add_signal_handler
+            signal.signal(sig, lambda signum, frame: loop.call_soon_threadsafe(_request_shutdown, signal.Signals(signum)))
+
+# Structured concurrency for background loops (asyncio.TaskGroup needs Python 3.11+)
+if hasattr(asyncio, "TaskGroup"):
+    _TaskGroup = asyncio.TaskGroup
+else:
+    class _TaskGroup:
+        """
+        Minimal stand-in for asyncio.TaskGroup on Python < 3.11
+        
+        The first child failure cancels the other children and the body of the
+        async with block, then is raised from the block.
+        """
+        
+        def __init__(self):
+            self._tasks = set()
+            self._error: BaseException = None
+            self._parent: asyncio.Task = None
+        
+        async def __aenter__(self):
+            self._parent = asyncio.current_task()
+            return self
+        
+        def create_task(self, coro, name: str = None) -> asyncio.Task:
+            task = asyncio.create_task(coro, name=name)
+            self._tasks.add(task)
+            task.add_done_callback(self._on_done)
+            return task
+        
+        def _on_done(self, task: asyncio.Task):
+            self._tasks.discard(task)
+            if task.cancelled() or task.exception() is None or self._error is not None:
+                return
+            self._error = task.exception()
+            for other in self._tasks:
+                other.cancel()
+            self._parent.cancel()
+        
+        async def __aexit__(self, exc_type, exc, tb):
+            if exc is not None and self._error is None:
+                for task in self._tasks:
+                    task.cancel()
+            while self._tasks:
+                try:
+                    await asyncio.wait(set(self._tasks))
+                except asyncio.CancelledError:
+                    if self._error is None:
+                        raise
+            if self._error is not None:
+                raise self._error
+            return False
+
+def _stats_interval(idle_polls: int) -> float:
+    """Seconds until the next stats poll: short while trades flow, longer when idle"""
+    if idle_polls < 10:
+        return 1.0
+    if idle_polls < 20:
+        return 5.0
+    return 30.0
+
+async def _stats_pump():
+    """Print stats and push them to Telegram until shutdown"""
+    last_key = None
+    last_total = 0
+    idle_polls = 20  # Start in the idle interval until the first trade
+    while not stop_event.is_set():
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=_stats_interval(idle_polls))
+            return
+        except asyncio.TimeoutError:
+            pass
+        
+        stats = copy_trader.get_stats()
+        stats["is_running"] = copy_trader.is_running
+        if stats["total_copies"] > last_total:
+            idle_polls = 0
+        else:
+            idle_polls += 1
+        last_total = stats["total_copies"]
+        
+        # Nothing to report unless the numbers moved since the last report
+        key = (
+            stats.get("total_copies", 0),
+            stats.get("successful_copies", 0),
+            round(stats.get("avg_latency_ms", 0.0), 1),
+            stats["is_running"],
+        )
+        if key == last_key:
+            continue
+        last_key = key
+        
+        if stats["total_copies"] > 0:
+            print(f"\n📊 Stats: {stats['successful_copies']}/{stats['total_copies']} successful | "
+                  f"Avg latency: {stats['avg_latency_ms']:.2f}ms")
+            if telegram_monitor:
+                await telegram_monitor.update_stats(stats)
 
 async def main():
     """Main function"""
-    global copy_trader
+    global copy_trader, stop_event
+    stop_event = asyncio.Event()
     
     # Validate configuration
     try:
         Config.validate()
     except ValueError as e:
-        print(f"Configuration error: {e}")
-        print("\nRequired configuration in .env file:")
-        print("  - MASTER_WALLET_ADDRESS: Wallet address to copy from")
-        print("  - PRIVATE_KEY_ENCRYPTED: Your encrypted trading wallet private key")
-        print("  - YELLOWSTONE_GRPC_URL: Yellow Stone Geyser gRPC endpoint")
-        print("\nOptional configuration:")
-        print("  - RPC_ENDPOINT: Solana RPC endpoint (default: testnet)")
-        print("  - NETWORK: testnet or mainnet (default: testnet)")
-        print("\nTo encrypt your wallet, run: python encrypt_wallet.py")
-        print("See env.example for template (copy to .env and fill in values)")
+        sys.stdout.write(f"""Configuration error: {e}
+
+Required configuration in .env file:
+  - MASTER_WALLET_ADDRESS: Wallet address to copy from
+  - PRIVATE_KEY_ENCRYPTED: Your encrypted trading wallet private key
+  - YELLOWSTONE_GRPC_URL: Yellow Stone Geyser gRPC endpoint
+
+Optional configuration:
+  - RPC_ENDPOINT: Solana RPC endpoint (default: testnet)
+  - NETWORK: testnet or mainnet (default: testnet)
+
+To encrypt your wallet, run: python encrypt_wallet.py
+See env.example for template (copy to .env and fill in values)
+""")
+        sys.stdout.flush()
         return
     
     # Register signal handlers
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    _install_signal_handlers(asyncio.get_running_loop())
     
-    # Initialize Telegram bot if available
+    copy_trader = CopyTrader()
+    
+    # Create Telegram bot if available (it connects below, alongside the trader)
     global telegram_monitor
     if TELEGRAM_AVAILABLE:
         try:
-            telegram_monitor = TelegramMonitor()
-            await telegram_monitor.initialize()
-            # Set copy_trader reference after initialization
-            if copy_trader:
-                telegram_monitor.copy_trader = copy_trader
-                telegram_monitor.trade_db = copy_trader.trade_db
-            print("✅ Telegram monitoring enabled")
-            # Keep Telegram bot running in background
-            # The polling is already started in initialize()
+            telegram_monitor = TelegramMonitor(copy_trader=copy_trader)
         except Exception as e:
             print(f"⚠️ Telegram bot not configured: {e}")
             print("   Bot will continue without Telegram notifications")
             telegram_monitor = None
     
-    # Initialize and start copy trader
-    copy_trader = CopyTrader()
-    
-    # Update telegram_monitor with copy_trader reference
-    if telegram_monitor:
-        telegram_monitor.copy_trader = copy_trader
-        telegram_monitor.trade_db = copy_trader.trade_db
-    
+    trader_task = None
     try:
-        print("=" * 50)
-        print("Solana Copy Trading Bot")
-        print(f"Network: {Config.NETWORK}")
-        print(f"Master Wallet: {Config.MASTER_WALLET_ADDRESS}")
-        print(f"Max Latency: {Config.MAX_LATENCY_MS}ms")
+        banner = [
+            "=" * 50,
+            "Solana Copy Trading Bot",
+            f"Network: {Config.NETWORK}",
+            f"Master Wallet: {Config.MASTER_WALLET_ADDRESS}",
+            f"Max Latency: {Config.MAX_LATENCY_MS}ms",
+        ]
         if telegram_monitor:
-            print("📱 Telegram monitoring: Enabled")
-        print("=" * 50)
+            banner.append("📱 Telegram monitoring: Enabled")
+        banner.append("=" * 50)
+        sys.stdout.write("\n".join(banner) + "\n")
+        sys.stdout.flush()
+        
+        # start() runs for as long as the subscription is open
+        trader_task = asyncio.create_task(copy_trader.start(), name="copy_trader")
+        trader_task.add_done_callback(lambda _: stop_event.set())
         
-        await copy_trader.start()
+        # Telegram connects while the trader loads the wallet and connects to gRPC
+        if telegram_monitor:
+            try:
+                await telegram_monitor.initialize()
+                print("✅ Telegram monitoring enabled")
+            except Exception as e:
+                print(f"⚠️ Telegram bot failed to start: {e}")
+                print("   Bot will continue without Telegram notifications")
+                telegram_monitor = None
         
         # Update Telegram stats if available
         if telegram_monitor:
@@ -95,38 +207,27 @@ async def main():
             stats["is_running"] = True
             await telegram_monitor.update_stats(stats)
         
-        # Keep running
-        last_stats_update = 0
-        while copy_trader.is_running:
-            await asyncio.sleep(5)  # Check every 5 seconds
+        # Background loops are supervised: if one crashes, the others are
+        # cancelled and the error propagates out of main() instead of being lost
+        async with _TaskGroup() as tg:
+            tg.create_task(_stats_pump(), name="stats_pump")
             
-            # Get stats
-            stats = copy_trader.get_stats()
-            stats["is_running"] = copy_trader.is_running
-            
-            # Print stats periodically (every 30 seconds)
-            import time
-            current_time = time.time()
-            if current_time - last_stats_update > 30:
-                if stats["total_copies"] > 0:
-                    print(f"\n📊 Stats: {stats['successful_copies']}/{stats['total_copies']} successful | "
-                          f"Avg latency: {stats['avg_latency_ms']:.2f}ms")
-                last_stats_update = current_time
-            
-            # Update Telegram stats periodically (every 30 seconds or when new trades)
-            if telegram_monitor:
-                if stats.get("total_copies", 0) > 0:
-                    await telegram_monitor.update_stats(stats)
+            # Keep running until a signal arrives or the trader exits
+            await stop_event.wait()
+        if trader_task.done():
+            trader_task.result()  # Surface a startup/subscription error
     
     except KeyboardInterrupt:
         print("\nReceived interrupt signal")
     except Exception as e:
         print(f"Error: {e}")
-        import traceback
         traceback.print_exc()
     finally:
         if copy_trader:
             await copy_trader.stop()
+        if trader_task and not trader_task.done():
+            trader_task.cancel()
+            await asyncio.gather(trader_task, return_exceptions=True)
         if telegram_monitor:
             await telegram_monitor.stop()
 
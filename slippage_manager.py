@@ -2,16 +2,40 @@
 Slippage, fees, and tips calculation and management
 """
 from config import Config
-from typing import Dict, Optional
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
 import asyncio
 
+def _calc_required(base: float, slippage_mul: float, static_fee: float, is_buy: bool) -> float:
+    """Balance needed for a trade: slippage-adjusted cost plus fees for buys, the amount for sells"""
+    return base * slippage_mul + static_fee if is_buy else base
+
+@dataclass(frozen=True, slots=True)
 class SlippageManager:
-    """Manages slippage, transaction fees, and tips"""
+    """
+    Manages slippage, transaction fees, and tips
+    
+    Settings default to the current Config values. Instances are immutable,
+    so changed settings mean building a new manager.
+    """
+    
+    slippage_tolerance: float = field(default_factory=lambda: Config.SLIPPAGE_TOLERANCE)
+    fee_buffer: float = field(default_factory=lambda: Config.FEE_BUFFER)
+    tips_amount: float = field(default_factory=lambda: Config.TIPS_AMOUNT)
+    
+    # Derived values used on every trade, computed once in __post_init__
+    _slippage_multiplier: float = field(init=False, repr=False, compare=False)
+    _default_fee: float = field(init=False, repr=False, compare=False)
+    _calc: Dict[bool, Callable[[float], Dict[str, float]]] = field(init=False, repr=False, compare=False)
+    
+    BASE_FEE = 0.000005  # 5000 lamports per signature
+    DEFAULT_TX_SIZE = 1232  # Max Solana transaction size in bytes
     
-    def __init__(self):
-        self.slippage_tolerance = Config.SLIPPAGE_TOLERANCE
-        self.fee_buffer = Config.FEE_BUFFER
-        self.tips_amount = Config.TIPS_AMOUNT
+    def __post_init__(self):
+        # Frozen, so derived fields are set through object.__setattr__
+        object.__setattr__(self, "_slippage_multiplier", 1 + self.slippage_tolerance / 100)
+        object.__setattr__(self, "_default_fee", self._fees_for_size(self.DEFAULT_TX_SIZE))
+        object.__setattr__(self, "_calc", {True: self._buy_calc, False: self._sell_calc})
     
     def calculate_slippage_adjusted_amount(
         self, 
@@ -28,12 +52,13 @@ class SlippageManager:
         Returns:
             Adjusted amount accounting for slippage
         """
-        slippage = slippage_percent or self.slippage_tolerance
         # For buys: increase amount to account for slippage
         # For sells: decrease amount to account for slippage
-        return base_amount * (1 + slippage / 100)
+        if not slippage_percent:
+            return base_amount * self._slippage_multiplier
+        return base_amount * (1 + slippage_percent / 100)
     
-    def calculate_total_fees(self, transaction_size: int = 1232) -> float:
+    def calculate_total_fees(self, transaction_size: int = DEFAULT_TX_SIZE) -> float:
         """
         Calculate total transaction fees
         
@@ -43,15 +68,14 @@ class SlippageManager:
         Returns:
             Total fees in SOL
         """
-        # Base fee: 5000 lamports per signature
-        # Transaction size fee: varies
-        # Priority fee: tips
-        base_fee = 0.000005  # 5000 lamports
+        if transaction_size == self.DEFAULT_TX_SIZE:
+            return self._default_fee
+        return self._fees_for_size(transaction_size)
+    
+    def _fees_for_size(self, transaction_size: int) -> float:
+        """Base fee + size fee (approximate) + priority fee (tips) + buffer"""
         size_fee = (transaction_size / 1000) * 0.000001  # Approximate
-        priority_fee = self.tips_amount
-        
-        total = base_fee + size_fee + priority_fee + self.fee_buffer
-        return total
+        return self.BASE_FEE + size_fee + self.tips_amount + self.fee_buffer
     
     def calculate_trade_amount_with_fees(
         self, 
@@ -68,30 +92,36 @@ class SlippageManager:
         Returns:
             Dictionary with calculated amounts
         """
-        # Calculate slippage adjustment
-        slippage_adjusted = self.calculate_slippage_adjusted_amount(trade_amount)
-        
-        # Calculate fees
-        fees = self.calculate_total_fees()
-        
-        if is_buy:
-            # For buys: need to account for fees in the total cost
-            total_cost = slippage_adjusted + fees
-            final_amount = trade_amount
-        else:
-            # For sells: fees reduce the amount received
-            total_cost = fees
-            final_amount = slippage_adjusted - fees
-        
+        return self._calc[bool(is_buy)](trade_amount)
+    
+    def _buy_calc(self, trade_amount: float) -> Dict[str, float]:
+        """Buy breakdown: fees are added to the total cost"""
+        slippage_adjusted = trade_amount * self._slippage_multiplier
+        return {
+            "base_amount": trade_amount,
+            "slippage_adjusted": slippage_adjusted,
+            "fees": self._default_fee,
+            "total_cost": slippage_adjusted + self._default_fee,
+            "final_amount": max(0, trade_amount),  # Ensure non-negative
+            "tips": self.tips_amount
+        }
+    
+    def _sell_calc(self, trade_amount: float) -> Dict[str, float]:
+        """Sell breakdown: fees reduce the amount received"""
+        slippage_adjusted = trade_amount * self._slippage_multiplier
         return {
             "base_amount": trade_amount,
             "slippage_adjusted": slippage_adjusted,
-            "fees": fees,
-            "total_cost": total_cost,
-            "final_amount": max(0, final_amount),  # Ensure non-negative
+            "fees": self._default_fee,
+            "total_cost": self._default_fee,
+            "final_amount": max(0, slippage_adjusted - self._default_fee),  # Ensure non-negative
             "tips": self.tips_amount
         }
     
+    def _required_balance(self, trade_amount: float, is_buy: bool) -> float:
+        """Balance needed for a trade (see _calc_required)"""
+        return _calc_required(trade_amount, self._slippage_multiplier, self._default_fee, is_buy)
+    
     def validate_trade(
         self, 
         trade_amount: float, 
@@ -109,15 +139,8 @@ class SlippageManager:
         Returns:
             Tuple of (is_valid, error_message)
         """
-        calculation = self.calculate_trade_amount_with_fees(trade_amount, is_buy)
-        
-        if is_buy:
-            required = calculation["total_cost"]
-            if available_balance < required:
-                return False, f"Insufficient balance. Need {required} SOL, have {available_balance} SOL"
-        else:
-            if available_balance < trade_amount:
-                return False, f"Insufficient balance. Need {trade_amount} SOL, have {available_balance} SOL"
-        
+        required = self._required_balance(trade_amount, is_buy)
+        if available_balance < required:
+            return False, f"Insufficient balance. Need {required} SOL, have {available_balance} SOL"
         return True, ""
 
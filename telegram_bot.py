@@ -2,16 +2,203 @@
 Telegram bot for monitoring copy trading bot stats
 """
 import asyncio
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
 from typing import Dict, Optional
 from telegram import Bot, Update
-from telegram.ext import Application, CommandHandler, ContextTypes
+from telegram.error import RetryAfter
+from telegram.ext import Application, CommandHandler, ContextTypes, filters
+from telegram.request import HTTPXRequest
 from config import Config
+from slippage_manager import SlippageManager
 from trade_database import TradeDatabase
 import os
 
+logger = logging.getLogger(__name__)
+
+# While the bot runs, handlers only enqueue records and the listener thread does
+# the stdout writes, so a slow or redirected stdout never blocks the event loop
+_log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+_log_handler = logging.StreamHandler(sys.stdout)
+_log_handler.setFormatter(logging.Formatter("%(message)s"))
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+_log_listener_running = False
+logger.addHandler(_log_handler)  # Direct writes until _start_log_listener()
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
+def _start_log_listener():
+    """Route log records through the background writer (no-op if already running)"""
+    global _log_listener_running
+    if _log_listener_running:
+        return
+    _log_listener.start()
+    logger.removeHandler(_log_handler)
+    logger.addHandler(_queue_handler)
+    _log_listener_running = True
+
+def _stop_log_listener():
+    """Write out queued records, stop the writer thread and go back to direct writes"""
+    global _log_listener_running
+    if not _log_listener_running:
+        return
+    logger.removeHandler(_queue_handler)
+    logger.addHandler(_log_handler)
+    _log_listener.stop()
+    _log_listener_running = False
+
+# Static reply text, built once at import
+_START_HELP = """
+🤖 *Copy Trading Bot Monitor*
+
+*Basic Commands:*
+/start - Show this message
+/stats - Show current statistics  
+/status - Show bot status
+
+*New Features:*
+/pnl [hour|day|week|total] - Show profit & loss
+/latency - Show latency breakdown
+/trades [successful|failed|errors] - Show trade history
+/duration - Show trade duration stats
+/lotsize - Show lot size settings
+/setlotsize <mode> <value> - Set lot size
+   Modes: fixed, percentage, multiplier
+   Example: /setlotsize percentage 10
+/fees - Show tips & slippage settings
+/setslippage <value> - Set slippage (e.g., 1.0)
+/settips <value> - Set tips in SOL (e.g., 0.0001)
+/dashboard - Complete dashboard view
+
+Bot will automatically send updates when trades are executed.
+""".strip()
+
+_LOTSIZE_HDR = "⚙️ *Lot Size Settings*\n\n"
+
+_PNL_HEADERS = {
+    "hour": "📈 *Hourly PnL Report*\n\n",
+    "day": "📈 *Daily PnL Report*\n\n",
+    "week": "📈 *Weekly PnL Report*\n\n",
+    "total": "📈 *Total PnL Report*\n\n",
+}
+
+# Reply templates for the settings commands
+_FEES_TEMPLATE = (
+    "💰 *Tips & Slippage Settings*\n\n"
+    "*Slippage Tolerance:* {slip}%\n"
+    "*Tips/Priority Fee:* {tips} SOL\n"
+    "*Fee Buffer:* {buf} SOL\n\n"
+    "Use /setslippage <value> to change slippage\n"
+    "Use /settips <value> to change tips"
+)
+_SETLOTSIZE_TEMPLATE = (
+    "✅ Lot size updated:\n\n"
+    "*Mode:* {mode}\n"
+    "*Value:* {value}\n\n"
+    "Applies to the next trade and is saved across restarts."
+)
+_SETSLIPPAGE_TEMPLATE = (
+    "✅ Slippage updated to {value}%\n\n"
+    "Applies to the next trade and is saved across restarts."
+)
+_SETTIPS_TEMPLATE = (
+    "✅ Tips updated to {value} SOL\n\n"
+    "Applies to the next trade and is saved across restarts."
+)
+
+# Queued by stop(): _notif_worker sends what is ahead of it, then exits
+_NOTIFY_STOP = object()
+
+def _format_trade_notification(trade_info: Dict) -> str:
+    """Format one trade notification"""
+    is_success = trade_info.get("success", False)
+    latency = trade_info.get("latency_ms", 0)
+    
+    emoji = "✅" if is_success else "❌"
+    status = "Success" if is_success else "Failed"
+    
+    return (
+        f"{emoji} *Copy Trade Executed*\n\n"
+        f"Status: {status}\n"
+        f"Latency: {latency:.2f}ms\n"
+        f"Time: {trade_info.get('timestamp', 'N/A')}"
+    )
+
+# Duration units, largest first: (threshold seconds, divisor, suffix)
+_DUR_UNITS = ((3600, 3600.0, "h"), (60, 60.0, "m"))
+
+def _fmt_duration(seconds: float) -> str:
+    """Convert seconds to human-readable format"""
+    for threshold, divisor, suffix in _DUR_UNITS:
+        if seconds >= threshold:
+            return f"{seconds / divisor:.1f}{suffix}"
+    return f"{seconds:.1f}s"
+
+def _entry_time(entry: Dict) -> str:
+    """HH:MM:SS display time of a trade/error record"""
+    time_str = entry.get("time_str")  # Stored on insert by TradeDatabase
+    if time_str:
+        return time_str
+    timestamp = entry.get("timestamp", "")
+    try:
+        return datetime.fromisoformat(timestamp).strftime("%H:%M:%S")
+    except (TypeError, ValueError):
+        return timestamp[:8] if len(timestamp) > 8 else timestamp
+
+def _split_message(text: str, limit: int):
+    """Split text into chunks under Telegram's message size limit, on entry boundaries"""
+    if len(text) < limit:
+        return [text]
+    chunks, current = [], ""
+    for block in text.split("\n\n"):
+        block += "\n\n"
+        if current and len(current) + len(block) >= limit:
+            chunks.append(current)
+            current = ""
+        # A single oversized block is hard-cut
+        while len(block) >= limit:
+            chunks.append(block[:limit - 1])
+            block = block[limit - 1:]
+        current += block
+    if current.strip():
+        chunks.append(current)
+    return chunks
+
 class TelegramMonitor:
     """Telegram bot for monitoring copy trading bot"""
     
+    # Fixed attribute set: no per-instance __dict__, faster attribute access
+    __slots__ = (
+        "bot_token", "chat_id", "webhook_url", "webhook_port",
+        "application", "copy_trader", "trade_db", "bot_stats", "status_message_id",
+        "_bot", "_polling_task", "_polling_ready", "_wallet_prefix",
+        "_stats_version", "_stats_cache_str", "_sent_stats_version",
+        "_pending_stats", "_flush_task", "_last_sent_total", "_trade_render_cache",
+        "_send_lock", "_send_times", "_send_resume_at",
+        "_notif_q", "_notif_task", "_settings_block", "_lotsize_block",
+    )
+    
+    # Counters shown by _format_stats()
+    STATS_KEYS = ("total_copies", "successful_copies", "failed_copies", "avg_latency_ms")
+    STATS_FLUSH_INTERVAL = 2.0  # seconds; at most one status edit per interval
+    STATS_MAX_BUFFER = 10  # new trades since the last send that force an immediate flush
+    TRADES_PAGE_SIZE = 10  # entries per /trades page
+    TRADE_RENDER_CACHE_SIZE = 200  # rendered /trades entries kept (least recently used dropped)
+    MAX_MESSAGE_CHARS = 4000  # stay under Telegram's 4096-char message limit
+    SEND_MIN_INTERVAL = 1.0  # seconds between outbound messages to the chat
+    SEND_PER_MINUTE = 20  # outbound messages per rolling minute
+    SEND_RETRIES = 3  # attempts per message when Telegram answers RetryAfter
+    POLLING_START_TIMEOUT = 5.0  # seconds initialize() waits for polling to come up
+    NOTIFY_QUEUE_SIZE = 1000  # queued trade notifications; the oldest is dropped when full
+    NOTIFY_BATCH_CHARS = 3900  # max length of one batched notification message
+    NOTIFY_STOP_TIMEOUT = 10.0  # seconds stop() waits for queued notifications to go out
+    
     def __init__(self, bot_token: str = None, chat_id: str = None, copy_trader=None):
         """
         Initialize Telegram bot
@@ -23,15 +210,26 @@ class TelegramMonitor:
         """
         self.bot_token = bot_token or os.getenv("TELEGRAM_BOT_TOKEN", "")
         self.chat_id = chat_id or os.getenv("TELEGRAM_CHAT_ID", "")
+        # Public HTTPS URL for webhook mode (long polling is used when empty)
+        self.webhook_url = os.getenv("TELEGRAM_WEBHOOK_URL", "").rstrip("/")
+        self.webhook_port = int(os.getenv("TELEGRAM_WEBHOOK_PORT", "8443"))
         
         if not self.bot_token:
             raise ValueError("TELEGRAM_BOT_TOKEN not set in .env file")
         if not self.chat_id:
             raise ValueError("TELEGRAM_CHAT_ID not set in .env file")
+        # Used for the command filter in initialize(): a numeric ID or an @username
+        chat = str(self.chat_id)
+        if not chat.startswith("@") and not chat.lstrip("-").isdigit():
+            raise ValueError(f"TELEGRAM_CHAT_ID must be a numeric chat ID or @username, got {chat!r}")
         
         self.application = None
+        self._polling_task: Optional[asyncio.Task] = None
+        self._polling_ready: Optional[asyncio.Event] = None
+        self._bot: Optional[Bot] = None  # Shared Bot (and its connection pool) for all sends
         self.copy_trader = copy_trader  # Store reference to copy_trader
-        self.trade_db = TradeDatabase()  # Initialize trade database
+        # Share the trader's database; a second instance would replay the same files
+        self.trade_db = copy_trader.trade_db if copy_trader is not None else TradeDatabase()
         self.bot_stats: Dict = {
             "total_copies": 0,
             "successful_copies": 0,
@@ -41,179 +239,191 @@ class TelegramMonitor:
             "is_running": False
         }
         self.status_message_id: Optional[int] = None
+        self._wallet_prefix = Config.MASTER_WALLET_ADDRESS[:10]
+        self._stats_version = 0  # Bumped whenever the displayed counters change
+        self._stats_cache_str: Optional[str] = None  # Rendered _format_stats() output
+        self._sent_stats_version = -1  # _stats_version shown in status_message_id
+        self._pending_stats: Optional[Dict] = None  # Latest stats waiting to be sent
+        self._flush_task: Optional[asyncio.Task] = None
+        self._last_sent_total = 0
+        self._trade_render_cache: OrderedDict = OrderedDict()  # trade_id -> (pnl, rendered /trades entry), LRU
+        # Outbound rate limiting: sends queue on the lock instead of tripping 429s
+        self._send_lock = asyncio.Lock()
+        self._send_times = deque(maxlen=self.SEND_PER_MINUTE)  # monotonic times of recent sends
+        self._send_resume_at = 0.0  # monotonic time Telegram asked us to wait until
+        self._notif_q: Optional[asyncio.Queue] = None  # Trade notifications awaiting _notif_worker
+        self._notif_task: Optional[asyncio.Task] = None
+        # Rendered Config-derived text; cleared by _invalidate_settings() when a setter runs
+        self._settings_block: Optional[str] = None
+        self._lotsize_block: Optional[str] = None
     
     async def initialize(self):
         """Initialize Telegram bot"""
+        _start_log_listener()
+        
         # Build application with token
-        self.application = Application.builder().token(self.bot_token).build()
+        # Handlers run concurrently so a slow /dashboard doesn't hold up other commands
+        self.application = Application.builder().token(self.bot_token).concurrent_updates(True).build()
+        self._bot = self.application.bot
         
         # Add command handlers BEFORE initialization
-        self.application.add_handler(CommandHandler("start", self.start_command))
-        self.application.add_handler(CommandHandler("stats", self.stats_command))
-        self.application.add_handler(CommandHandler("status", self.status_command))
-        
-        # New commands for buyer features
-        self.application.add_handler(CommandHandler("pnl", self.pnl_command))
-        self.application.add_handler(CommandHandler("latency", self.latency_command))
-        self.application.add_handler(CommandHandler("trades", self.trades_command))
-        self.application.add_handler(CommandHandler("duration", self.duration_command))
-        self.application.add_handler(CommandHandler("lotsize", self.lotsize_command))
-        self.application.add_handler(CommandHandler("dashboard", self.dashboard_command))
-        self.application.add_handler(CommandHandler("setlotsize", self.setlotsize_command))
-        self.application.add_handler(CommandHandler("setslippage", self.setslippage_command))
-        self.application.add_handler(CommandHandler("settips", self.settips_command))
-        self.application.add_handler(CommandHandler("fees", self.fees_command))
+        # Only the configured chat may use the bot: some commands change live trading settings
+        chat = str(self.chat_id)
+        if chat.startswith("@"):
+            chat_filter = filters.Chat(username=chat)
+        else:
+            chat_filter = filters.Chat(chat_id=int(chat))
+        # block=False lets each handler run without holding up the next update
+        for name, callback in (
+            ("start", self.start_command),
+            ("stats", self.stats_command),
+            ("status", self.status_command),
+            # New commands for buyer features
+            ("pnl", self.pnl_command),
+            ("latency", self.latency_command),
+            ("trades", self.trades_command),
+            ("duration", self.duration_command),
+            ("lotsize", self.lotsize_command),
+            ("dashboard", self.dashboard_command),
+            ("setlotsize", self.setlotsize_command),
+            ("setslippage", self.setslippage_command),
+            ("settips", self.settips_command),
+            ("fees", self.fees_command),
+        ):
+            self.application.add_handler(CommandHandler(name, callback, filters=chat_filter, block=False))
         
         # Initialize and start bot
         await self.application.initialize()
         await self.application.start()
         
-        print(f"✅ Telegram bot started")
-        print(f"📱 Bot is ready. Chat ID: {self.chat_id}")
+        logger.info("✅ Telegram bot started")
+        logger.info("📱 Bot is ready. Chat ID: %s", self.chat_id)
         
         # CRITICAL FIX: Start polling - it must run in the same event loop
         # The polling needs to process updates continuously
-        import asyncio
-        
-        print(f"🔄 Starting Telegram polling...")
+        logger.info("🔄 Starting Telegram polling...")
         
         # Start polling in background task - this is the CORRECT way
         # start_polling() is async and will run continuously
         async def run_polling_forever():
             """Run polling continuously until stopped"""
             try:
-                print(f"🔄 Polling started, waiting for updates...")
-                # Start polling with minimal parameters - only supported ones
-                # For python-telegram-bot 21.7, use basic parameters only
-                await self.application.updater.start_polling(
-                    drop_pending_updates=True,
-                    allowed_updates=["message"]
-                )
-                # This line will never be reached as polling runs forever
+                if self.webhook_url:
+                    # Telegram pushes updates to us, no getUpdates round-trips at all
+                    logger.info("🔄 Webhook started on port %s, waiting for updates...", self.webhook_port)
+                    await self.application.updater.start_webhook(
+                        listen="0.0.0.0",
+                        port=self.webhook_port,
+                        url_path=self.bot_token,
+                        webhook_url=f"{self.webhook_url}/{self.bot_token}",
+                        drop_pending_updates=True,
+                        allowed_updates=["message"]
+                    )
+                else:
+                    logger.info("🔄 Polling started, waiting for updates...")
+                    # Long polling: each getUpdates waits up to 25s for new updates
+                    await self.application.updater.start_polling(
+                        timeout=25,
+                        poll_interval=0.0,
+                        bootstrap_retries=-1,
+                        drop_pending_updates=True,
+                        allowed_updates=["message"]
+                    )
+                # The updater now polls in its own task; startup is done
+                self._polling_ready.set()
             except asyncio.CancelledError:
-                print(f"🛑 Polling task cancelled")
+                logger.info("🛑 Polling task cancelled")
                 raise
             except Exception as e:
-                print(f"❌ CRITICAL: Polling failed: {e}")
-                print(f"   Error type: {type(e).__name__}")
-                print(f"   Bot will not receive commands!")
-                import traceback
-                traceback.print_exc()
+                logger.exception("❌ CRITICAL: Polling failed (%s: %s) - bot will not receive commands!", type(e).__name__, e)
                 # Re-raise to detect in initialization
                 raise
         
         # Create and store polling task - keep reference so it doesn't get garbage collected
+        # Trade notifications are formatted and sent off the trading path
+        self._notif_q = asyncio.Queue(maxsize=self.NOTIFY_QUEUE_SIZE)
+        self._notif_task = asyncio.create_task(self._notif_worker())
+        
+        self._polling_ready = asyncio.Event()
         self._polling_task = asyncio.create_task(run_polling_forever())
         
-        # Give polling a moment to start and verify it's running
-        await asyncio.sleep(2)
+        # Continue as soon as polling is live or has failed, rather than after a fixed delay
+        ready_waiter = asyncio.create_task(self._polling_ready.wait())
+        await asyncio.wait(
+            (self._polling_task, ready_waiter),
+            timeout=self.POLLING_START_TIMEOUT,
+            return_when=asyncio.FIRST_COMPLETED
+        )
+        ready_waiter.cancel()
         
-        # Check if polling task is still running (not crashed)
-        if self._polling_task.done():
-            # Task completed (means it errored)
+        if self._polling_ready.is_set():
+            logger.info("✅ Polling task is running (ready to receive commands)")
+        elif self._polling_task.done():
             try:
                 await self._polling_task  # This will raise the exception
             except Exception as e:
-                print(f"❌ Polling task failed: {e}")
-                print(f"   Bot commands will NOT work!")
+                logger.error("❌ Polling task failed: %s - bot commands will NOT work!", e)
         else:
-            print(f"✅ Polling task is running (ready to receive commands)")
+            logger.warning("⚠️ Polling not confirmed after %ss, still starting in background", self.POLLING_START_TIMEOUT)
         
-        print(f"📱 Bot is listening for commands...")
-        print(f"   Try sending /start to your bot in Telegram")
-        print(f"   Chat ID configured: {self.chat_id}")
+        logger.info("📱 Bot is listening for commands (try /start in Telegram). Chat ID configured: %s", self.chat_id)
         
         # Send startup message to verify bot is working
         try:
-            bot = self.application.bot
+            bot = self._bot
             result = await bot.send_message(
                 chat_id=self.chat_id,
                 text="🤖 *Copy Trading Bot Started*\n\nBot is now monitoring...\n\nUse /start to see commands",
                 parse_mode="Markdown"
             )
-            print(f"✅ Startup message sent successfully (Message ID: {result.message_id})")
+            logger.info("✅ Startup message sent successfully (Message ID: %s)", result.message_id)
         except Exception as e:
-            print(f"⚠️ Could not send startup message: {e}")
-            print(f"   Error type: {type(e).__name__}")
-            print(f"   Make sure:")
-            print(f"   1. CHAT_ID ({self.chat_id}) is correct")
-            print(f"   2. You've sent at least one message to the bot first")
-            print(f"   3. Bot token is valid")
+            logger.warning(
+                "⚠️ Could not send startup message (%s: %s). Make sure:\n"
+                "   1. CHAT_ID (%s) is correct\n"
+                "   2. You've sent at least one message to the bot first\n"
+                "   3. Bot token is valid",
+                type(e).__name__, e, self.chat_id
+            )
             
             # Try to get updates to verify bot is working
             try:
                 updates = await bot.get_updates(limit=1)
                 if updates:
-                    print(f"   ✓ Bot can receive updates")
+                    logger.info("   ✓ Bot can receive updates")
                     last_update = updates[-1]
                     if hasattr(last_update, 'message') and last_update.message:
                         actual_chat_id = last_update.message.chat.id
-                        print(f"   ⚠️ Last message chat ID: {actual_chat_id} (configured: {self.chat_id})")
+                        logger.warning("   ⚠️ Last message chat ID: %s (configured: %s)", actual_chat_id, self.chat_id)
                         if str(actual_chat_id) != str(self.chat_id):
-                            print(f"   ❌ CHAT_ID MISMATCH! Use: {actual_chat_id}")
+                            logger.error("   ❌ CHAT_ID MISMATCH! Use: %s", actual_chat_id)
             except Exception as e2:
-                print(f"   ⚠️ Could not verify bot: {e2}")
+                logger.warning("   ⚠️ Could not verify bot: %s", e2)
     
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
         try:
-            print(f"\n{'='*50}")
-            print(f"📨 RECEIVED /start COMMAND")
-            print(f"   Chat ID: {update.effective_chat.id if update.effective_chat else 'unknown'}")
-            print(f"   User: {update.effective_user.username if update.effective_user else 'unknown'}")
-            print(f"{'='*50}")
-            
-            message = """
-🤖 *Copy Trading Bot Monitor*
-
-*Basic Commands:*
-/start - Show this message
-/stats - Show current statistics  
-/status - Show bot status
-
-*New Features:*
-/pnl [hour|day|week|total] - Show profit & loss
-/latency - Show latency breakdown
-/trades [successful|failed|errors] - Show trade history
-/duration - Show trade duration stats
-/lotsize - Show lot size settings
-/setlotsize <mode> <value> - Set lot size
-   Modes: fixed, percentage, multiplier
-   Example: /setlotsize percentage 10
-/fees - Show tips & slippage settings
-/setslippage <value> - Set slippage (e.g., 1.0)
-/settips <value> - Set tips in SOL (e.g., 0.0001)
-/dashboard - Complete dashboard view
-
-Bot will automatically send updates when trades are executed.
-            """
-            
             if update.message:
-                print(f"✅ Sending reply...")
-                await update.message.reply_text(message.strip(), parse_mode="Markdown")
-                chat_id = update.effective_chat.id if update.effective_chat else "unknown"
-                print(f"✅ REPLY SENT to chat {chat_id}")
-                print(f"{'='*50}\n")
+                await update.message.reply_text(_START_HELP, parse_mode="Markdown")
+                logger.debug("📨 Processed /start command from %s", update.effective_chat.id if update.effective_chat else "unknown")
             else:
-                print(f"❌ update.message is None!")
+                logger.warning("❌ /start update has no message")
         except Exception as e:
-            print(f"❌ ERROR in start_command: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ ERROR in start_command: %s", e)
             try:
                 if update and update.message:
                     await update.message.reply_text("❌ Error processing command. Please try again.")
             except Exception as e2:
-                print(f"❌ Could not send error message: {e2}")
+                logger.error("❌ Could not send error message: %s", e2)
     
     async def stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /stats command"""
         try:
             stats_text = self._format_stats()
             await update.message.reply_text(stats_text, parse_mode="Markdown")
-            print(f"✅ Processed /stats command from {update.effective_chat.id}")
+            logger.debug("✅ Processed /stats command from %s", update.effective_chat.id)
         except Exception as e:
-            print(f"⚠️ Error in stats_command: {e}")
+            logger.exception("⚠️ Error in stats_command: %s", e)
             await update.message.reply_text("❌ Error getting stats. Please try again.")
     
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -222,13 +432,16 @@ Bot will automatically send updates when trades are executed.
             status_text = "🟢 Running" if self.bot_stats.get("is_running") else "🔴 Stopped"
             message = f"*Bot Status:* {status_text}\n\n{self._format_stats()}"
             await update.message.reply_text(message, parse_mode="Markdown")
-            print(f"✅ Processed /status command from {update.effective_chat.id}")
+            logger.debug("✅ Processed /status command from %s", update.effective_chat.id)
         except Exception as e:
-            print(f"⚠️ Error in status_command: {e}")
+            logger.exception("⚠️ Error in status_command: %s", e)
             await update.message.reply_text("❌ Error getting status. Please try again.")
     
     def _format_stats(self) -> str:
-        """Format stats for Telegram message"""
+        """Format stats for Telegram message (cached until the counters change)"""
+        if self._stats_cache_str is not None:
+            return self._stats_cache_str
+        
         stats = self.bot_stats
         total = stats.get("total_copies", 0)
         successful = stats.get("successful_copies", 0)
@@ -246,27 +459,55 @@ Bot will automatically send updates when trades are executed.
 📉 Success Rate: {success_rate:.1f}%
 ⚡ Avg Latency: {avg_latency:.2f}ms
 
-🔍 Monitoring: {Config.MASTER_WALLET_ADDRESS[:10]}...
+🔍 Monitoring: {self._wallet_prefix}...
         """
-        return message.strip()
+        self._stats_cache_str = message.strip()
+        return self._stats_cache_str
     
     async def update_stats(self, stats: Dict):
         """Update bot statistics"""
+        if any(key in stats and stats[key] != self.bot_stats.get(key) for key in self.STATS_KEYS):
+            self._stats_version += 1
+            self._stats_cache_str = None
         self.bot_stats.update(stats)
         
-        # Send update if there are new trades
+        # Send update if there are new trades (coalesced, see _schedule_flush)
         if stats.get("total_copies", 0) > 0:
-            await self.send_stats_update(stats)
+            self._pending_stats = stats
+            if stats["total_copies"] - self._last_sent_total > self.STATS_MAX_BUFFER:
+                await self._flush_stats()
+            else:
+                self._schedule_flush()
+    
+    def _schedule_flush(self):
+        """Send the pending stats after STATS_FLUSH_INTERVAL unless a send is already scheduled"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_after_delay())
+    
+    async def _flush_after_delay(self):
+        await asyncio.sleep(self.STATS_FLUSH_INTERVAL)
+        await self._flush_stats()
+    
+    async def _flush_stats(self):
+        """Send the latest pending stats, if any"""
+        stats, self._pending_stats = self._pending_stats, None
+        if stats is None:
+            return
+        self._last_sent_total = stats.get("total_copies", 0)
+        await self.send_stats_update(stats)
     
     async def send_stats_update(self, stats: Dict):
         """Send stats update message"""
+        if self.status_message_id and self._sent_stats_version == self._stats_version:
+            return  # Telegram rejects edits that leave the text unchanged
         message = self._format_stats()
+        self._sent_stats_version = self._stats_version
         
         # Try to update existing message, or send new one
         try:
             if self.status_message_id:
-                await self.application.bot.edit_message_text(
-                    chat_id=self.chat_id,
+                await self._call_limited(
+                    self._bot.edit_message_text,
                     message_id=self.status_message_id,
                     text=message,
                     parse_mode="Markdown"
@@ -284,41 +525,131 @@ Bot will automatically send updates when trades are executed.
     async def send_message(self, text: str, parse_mode: str = None) -> Optional[object]:
         """Send message to configured chat"""
         try:
-            # Use application bot if available, otherwise create new bot
-            if self.application and self.application.bot:
-                bot = self.application.bot
-            else:
-                bot = Bot(token=self.bot_token)
+            # Reuse one Bot so sends share a warm connection pool
+            if self._bot is None:
+                self._bot = Bot(
+                    token=self.bot_token,
+                    request=HTTPXRequest(connection_pool_size=8, http_version="1.1")
+                )
             
-            message = await bot.send_message(
-                chat_id=self.chat_id,
+            message = await self._call_limited(
+                self._bot.send_message,
                 text=text,
                 parse_mode=parse_mode
             )
             return message
         except Exception as e:
-            print(f"⚠️ Error sending Telegram message: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("⚠️ Error sending Telegram message: %s", e)
             return None
     
-    async def send_trade_notification(self, trade_info: Dict):
-        """Send notification when trade is executed"""
-        is_success = trade_info.get("success", False)
-        latency = trade_info.get("latency_ms", 0)
+    async def _wait_send_slot(self):
+        """Wait until another message to the chat fits the send rate limits"""
+        now = time.monotonic()
+        wait = self._send_resume_at - now
+        if self._send_times:
+            wait = max(wait, self._send_times[-1] + self.SEND_MIN_INTERVAL - now)
+        if len(self._send_times) == self.SEND_PER_MINUTE:
+            wait = max(wait, self._send_times[0] + 60.0 - now)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._send_times.append(time.monotonic())
+    
+    async def _call_limited(self, method, **kwargs):
+        """
+        Call a Bot send method for the configured chat under the rate limits
         
-        emoji = "✅" if is_success else "❌"
-        status = "Success" if is_success else "Failed"
+        Args:
+            method: Bound Bot coroutine method (send_message, edit_message_text, ...)
+            **kwargs: Arguments besides chat_id
         
-        message = f"""
-{emoji} *Copy Trade Executed*
-
-Status: {status}
-Latency: {latency:.2f}ms
-Time: {trade_info.get('timestamp', 'N/A')}
+        Returns:
+            The method's result
+        """
+        for attempt in range(self.SEND_RETRIES):
+            async with self._send_lock:
+                await self._wait_send_slot()
+            try:
+                return await method(chat_id=self.chat_id, **kwargs)
+            except RetryAfter as e:
+                if attempt == self.SEND_RETRIES - 1:
+                    raise
+                delay = e.retry_after
+                if isinstance(delay, timedelta):
+                    delay = delay.total_seconds()
+                logger.warning("⚠️ Telegram rate limit hit, retrying in %ss", delay)
+                self._send_resume_at = max(self._send_resume_at, time.monotonic() + delay)
+    
+    async def send_trade_notification(self, trade_info: Dict):
+        """Queue a notification for an executed trade (sent by _notif_worker)"""
+        if self._notif_q is None:
+            # Not initialized: no worker running, send inline
+            await self.send_message(_format_trade_notification(trade_info), parse_mode="Markdown")
+            return
+        self._enqueue_notification(trade_info)
+    
+    def _enqueue_notification(self, item):
+        """Queue item for _notif_worker, dropping the oldest rather than block the trader"""
+        if self._notif_q.full():
+            self._notif_q.get_nowait()
+        self._notif_q.put_nowait(item)
+    
+    def _next_batch(self, first: Dict):
         """
+        Combine first and as many queued notifications as fit into one message
         
-        await self.send_message(message.strip(), parse_mode="Markdown")
+        Args:
+            first: Notification already taken off the queue
+        
+        Returns:
+            (message text or None if nothing could be formatted,
+             notification that didn't fit / _NOTIFY_STOP, or None)
+        """
+        texts = []
+        size = 0
+        leftover = None
+        item = first
+        while True:
+            if item is _NOTIFY_STOP:
+                leftover = item
+                break
+            try:
+                text = _format_trade_notification(item)
+            except Exception as e:
+                # Skip the bad notification; the rest still go out
+                logger.exception("⚠️ Error formatting trade notification: %s", e)
+                text = None
+            if text is not None:
+                if texts and size + len(text) + 2 > self.NOTIFY_BATCH_CHARS:
+                    leftover = item
+                    break
+                texts.append(text)
+                size += len(text) + 2
+            if self._notif_q.empty():
+                break
+            item = self._notif_q.get_nowait()
+        if len(texts) <= 1:
+            return (texts[0] if texts else None), leftover
+        return f"🔔 *{len(texts)} trades:*\n\n" + "\n\n".join(texts), leftover
+    
+    async def _notif_worker(self):
+        """Send queued trade notifications, batching any that queued up meanwhile, until _NOTIFY_STOP"""
+        pending = None
+        while True:
+            first = pending if pending is not None else await self._notif_q.get()
+            if first is _NOTIFY_STOP:
+                return
+            message, pending = self._next_batch(first)
+            if message is None:
+                continue
+            try:
+                # send_message waits out rate limits, so the queue absorbs bursts meanwhile
+                await self.send_message(message, parse_mode="Markdown")
+            except Exception as e:
+                logger.exception("⚠️ Error sending trade notification: %s", e)
+    
+    async def _db(self, fn, *args, **kwargs):
+        """Run a TradeDatabase call in a worker thread so polling keeps running"""
+        return await asyncio.to_thread(fn, *args, **kwargs)
     
     # ==================== NEW COMMANDS ====================
     
@@ -330,17 +661,11 @@ Time: {trade_info.get('timestamp', 'N/A')}
             if period not in ["hour", "day", "week", "total"]:
                 period = "total"
             
-            pnl_data = self.trade_db.get_pnl_by_period(period)
-            total_pnl = self.trade_db.get_total_pnl()
+            snapshot = await self._db(self.trade_db.get_pnl_snapshot, period)
+            pnl_data = snapshot["by_period"]
+            total_pnl = snapshot["total"]
             
-            if period == "hour":
-                message = "📈 *Hourly PnL Report*\n\n"
-            elif period == "day":
-                message = "📈 *Daily PnL Report*\n\n"
-            elif period == "week":
-                message = "📈 *Weekly PnL Report*\n\n"
-            else:
-                message = "📈 *Total PnL Report*\n\n"
+            parts = [_PNL_HEADERS[period]]
             
             if pnl_data:
                 for period_key, data in sorted(pnl_data.items(), reverse=True):
@@ -350,160 +675,167 @@ Time: {trade_info.get('timestamp', 'N/A')}
                     trades = data.get("trades", 0)
                     
                     emoji = "✅" if net > 0 else "❌" if net < 0 else "➖"
-                    message += f"{emoji} *{period_key}*\n"
-                    message += f"💰 Profit: +{profit:.6f} SOL\n"
-                    message += f"📉 Loss: -{loss:.6f} SOL\n"
-                    message += f"📊 Net: {net:+.6f} SOL\n"
-                    message += f"📈 Trades: {trades}\n\n"
+                    parts.append(f"{emoji} *{period_key}*\n")
+                    parts.append(f"💰 Profit: +{profit:.6f} SOL\n")
+                    parts.append(f"📉 Loss: -{loss:.6f} SOL\n")
+                    parts.append(f"📊 Net: {net:+.6f} SOL\n")
+                    parts.append(f"📈 Trades: {trades}\n\n")
             else:
-                message += "No trades in this period yet.\n"
+                parts.append("No trades in this period yet.\n")
             
             # Add total summary
-            message += f"\n*Total Summary:*\n"
-            message += f"💰 Total Profit: +{total_pnl.get('total_profit', 0.0):.6f} SOL\n"
-            message += f"📉 Total Loss: -{total_pnl.get('total_loss', 0.0):.6f} SOL\n"
-            message += f"📊 Net PnL: {total_pnl.get('net_pnl', 0.0):+.6f} SOL\n"
-            message += f"📈 ROI: {total_pnl.get('roi', 0.0):+.2f}%"
+            parts.append(f"\n*Total Summary:*\n")
+            parts.append(f"💰 Total Profit: +{total_pnl.get('total_profit', 0.0):.6f} SOL\n")
+            parts.append(f"📉 Total Loss: -{total_pnl.get('total_loss', 0.0):.6f} SOL\n")
+            parts.append(f"📊 Net PnL: {total_pnl.get('net_pnl', 0.0):+.6f} SOL\n")
+            parts.append(f"📈 ROI: {total_pnl.get('roi', 0.0):+.2f}%")
             
+            message = "".join(parts)
             await update.message.reply_text(message, parse_mode="Markdown")
         except Exception as e:
-            print(f"⚠️ Error in pnl_command: {e}")
+            logger.exception("⚠️ Error in pnl_command: %s", e)
             await update.message.reply_text("❌ Error getting PnL data. Please try again.")
     
     async def latency_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /latency command - Show latency breakdown"""
         try:
-            averages = self.trade_db.get_latency_averages()
+            averages = await self._db(self.trade_db.get_latency_averages)
             stats = self.bot_stats
             
-            message = "⏱️ *Latency Breakdown*\n\n"
+            parts = ["⏱️ *Latency Breakdown*\n\n"]
             
             # Show per-trade latencies (last 10)
-            message += "*Last 10 Trades:*\n"
-            successful_trades = self.trade_db.get_successful_trades(limit=10)
+            parts.append("*Last 10 Trades:*\n")
+            successful_trades = await self._db(self.trade_db.get_successful_trades, limit=10)
+            max_latency = Config.MAX_LATENCY_MS
             if successful_trades:
-                for i, trade in enumerate(reversed(successful_trades[-10:]), 1):
-                    latency = trade.get("latency_ms", 0.0)
-                    emoji = "✅" if latency < Config.MAX_LATENCY_MS else "⚠️"
-                    message += f"{i}. {emoji} {latency:.2f}ms\n"
+                n = len(successful_trades)
+                for i, idx in enumerate(range(n - 1, max(-1, n - 11), -1), 1):
+                    latency = successful_trades[idx].get("latency_ms", 0.0)
+                    emoji = "✅" if latency < max_latency else "⚠️"
+                    parts.append(f"{i}. {emoji} {latency:.2f}ms\n")
             else:
-                message += "No trades yet.\n"
-            
-            message += "\n*Averages:*\n"
-            message += f"• Last 1 min: {averages.get('1min', 0.0):.2f}ms\n"
-            message += f"• Last 15 min: {averages.get('15min', 0.0):.2f}ms\n"
-            message += f"• Last 1 hour: {averages.get('1hour', 0.0):.2f}ms\n"
-            message += f"• Last 4 hours: {averages.get('4hours', 0.0):.2f}ms\n"
-            message += f"• Last 24 hours: {averages.get('24hours', 0.0):.2f}ms\n"
-            message += f"• All time: {averages.get('all_time', 0.0):.2f}ms\n"
-            message += f"\n*Target:* <{Config.MAX_LATENCY_MS}ms"
-            
-            if averages.get('all_time', 0.0) < Config.MAX_LATENCY_MS:
-                message += " ✅"
+                parts.append("No trades yet.\n")
+            
+            parts.append("\n*Averages:*\n")
+            parts.append(f"• Last 1 min: {averages.get('1min', 0.0):.2f}ms\n")
+            parts.append(f"• Last 15 min: {averages.get('15min', 0.0):.2f}ms\n")
+            parts.append(f"• Last 1 hour: {averages.get('1hour', 0.0):.2f}ms\n")
+            parts.append(f"• Last 4 hours: {averages.get('4hours', 0.0):.2f}ms\n")
+            parts.append(f"• Last 24 hours: {averages.get('24hours', 0.0):.2f}ms\n")
+            parts.append(f"• All time: {averages.get('all_time', 0.0):.2f}ms\n")
+            parts.append(f"\n*Target:* <{max_latency}ms")
+            
+            if averages.get('all_time', 0.0) < max_latency:
+                parts.append(" ✅")
             else:
-                message += " ⚠️"
+                parts.append(" ⚠️")
             
+            message = "".join(parts)
             await update.message.reply_text(message, parse_mode="Markdown")
         except Exception as e:
-            print(f"⚠️ Error in latency_command: {e}")
+            logger.exception("⚠️ Error in latency_command: %s", e)
             await update.message.reply_text("❌ Error getting latency data. Please try again.")
     
+    def _render_successful_trade(self, trade: Dict) -> str:
+        """Render one successful trade (without its #N prefix), cached by trade id"""
+        trade_id = trade.get("trade_id")
+        pnl = trade.get("pnl") or 0.0  # None until the position is closed
+        cached = self._trade_render_cache.get(trade_id)
+        # PnL is filled in when the position closes, so re-render on change
+        if cached is not None and cached[0] == pnl:
+            self._trade_render_cache.move_to_end(trade_id)
+            return cached[1]
+        
+        amount = trade.get("amount_in", 0.0)
+        latency = trade.get("latency_ms", 0.0)
+        pnl_emoji = "💰" if pnl > 0 else "📉" if pnl < 0 else "➖"
+        lines = [f"{_entry_time(trade)}\n", f"{pnl_emoji} Amount: {amount:.6f} SOL\n"]
+        if pnl:
+            lines.append(f"{pnl_emoji} PnL: {pnl:+.6f} SOL\n")
+        lines.append(f"⚡ Latency: {latency:.2f}ms\n\n")
+        rendered = "".join(lines)
+        if trade_id is not None:
+            cache = self._trade_render_cache
+            cache[trade_id] = (pnl, rendered)
+            cache.move_to_end(trade_id)
+            if len(cache) > self.TRADE_RENDER_CACHE_SIZE:
+                cache.popitem(last=False)
+        return rendered
+    
+    @staticmethod
+    def _render_failed_trade(trade: Dict) -> str:
+        """Render one failed trade (without its #N prefix)"""
+        reason = trade.get("reason", "Unknown")
+        master_amount = trade.get("master_amount", 0.0)
+        lines = [f"{_entry_time(trade)}\n", f"⚠️ Reason: {reason}\n"]
+        if master_amount > 0:
+            lines.append(f"📊 Master traded: {master_amount:.6f} SOL\n")
+        lines.append("\n")
+        return "".join(lines)
+    
+    @staticmethod
+    def _render_error(error: Dict) -> str:
+        """Render one error entry (without its #N prefix)"""
+        error_msg = error.get("error_message", "Unknown")
+        cause = error.get("potential_cause", "Unknown")
+        return (
+            f"{_entry_time(error)}\n"
+            f"⚠️ Error: {error_msg[:50]}...\n"
+            f"🔍 Cause: {cause}\n\n"
+        )
+    
     async def trades_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /trades command - Show trade history"""
         try:
             trade_type = context.args[0].lower() if context.args and len(context.args) > 0 else "successful"
+            try:
+                page = max(1, int(context.args[1])) if len(context.args) > 1 else 1
+            except ValueError:
+                page = 1
             
             if trade_type == "successful":
-                trades = self.trade_db.get_successful_trades(limit=20)
-                message = "✅ *Successful Trades* (Last 20)\n\n"
-                
-                if trades:
-                    for i, trade in enumerate(reversed(trades[-20:]), 1):
-                        timestamp = trade.get("timestamp", "")
-                        amount = trade.get("amount_in", 0.0)
-                        pnl = trade.get("pnl", 0.0)
-                        latency = trade.get("latency_ms", 0.0)
-                        
-                        # Format timestamp
-                        try:
-                            from datetime import datetime
-                            dt = datetime.fromisoformat(timestamp)
-                            time_str = dt.strftime("%H:%M:%S")
-                        except:
-                            time_str = timestamp[:8] if len(timestamp) > 8 else timestamp
-                        
-                        pnl_emoji = "💰" if pnl > 0 else "📉" if pnl < 0 else "➖"
-                        message += f"*#{i}* - {time_str}\n"
-                        message += f"{pnl_emoji} Amount: {amount:.6f} SOL\n"
-                        if pnl:
-                            message += f"{pnl_emoji} PnL: {pnl:+.6f} SOL\n"
-                        message += f"⚡ Latency: {latency:.2f}ms\n\n"
-                else:
-                    message += "No successful trades yet."
-                    
+                getter, render = self.trade_db.get_successful_trades, self._render_successful_trade
+                title, empty = "✅ *Successful Trades*", "No successful trades yet."
             elif trade_type == "failed":
-                trades = self.trade_db.get_failed_trades(limit=20)
-                message = "❌ *Failed/Non-Executed Trades* (Last 20)\n\n"
-                
-                if trades:
-                    for i, trade in enumerate(reversed(trades[-20:]), 1):
-                        timestamp = trade.get("timestamp", "")
-                        reason = trade.get("reason", "Unknown")
-                        master_amount = trade.get("master_amount", 0.0)
-                        
-                        try:
-                            from datetime import datetime
-                            dt = datetime.fromisoformat(timestamp)
-                            time_str = dt.strftime("%H:%M:%S")
-                        except:
-                            time_str = timestamp[:8] if len(timestamp) > 8 else timestamp
-                        
-                        message += f"*#{i}* - {time_str}\n"
-                        message += f"⚠️ Reason: {reason}\n"
-                        if master_amount > 0:
-                            message += f"📊 Master traded: {master_amount:.6f} SOL\n"
-                        message += "\n"
-                else:
-                    message += "No failed trades yet."
-                    
+                getter, render = self.trade_db.get_failed_trades, self._render_failed_trade
+                title, empty = "❌ *Failed/Non-Executed Trades*", "No failed trades yet."
             elif trade_type == "errors":
-                errors = self.trade_db.get_errors(limit=20)
-                message = "❌ *Errors List* (Last 20)\n\n"
-                
-                if errors:
-                    for i, error in enumerate(reversed(errors[-20:]), 1):
-                        timestamp = error.get("timestamp", "")
-                        error_msg = error.get("error_message", "Unknown")
-                        cause = error.get("potential_cause", "Unknown")
-                        
-                        try:
-                            from datetime import datetime
-                            dt = datetime.fromisoformat(timestamp)
-                            time_str = dt.strftime("%H:%M:%S")
-                        except:
-                            time_str = timestamp[:8] if len(timestamp) > 8 else timestamp
-                        
-                        message += f"*#{i}* - {time_str}\n"
-                        message += f"⚠️ Error: {error_msg[:50]}...\n"
-                        message += f"🔍 Cause: {cause}\n\n"
-                else:
-                    message += "No errors recorded yet."
+                getter, render = self.trade_db.get_errors, self._render_error
+                title, empty = "❌ *Errors List*", "No errors recorded yet."
+            else:
+                await update.message.reply_text("❌ Invalid trade type. Use: /trades successful|failed|errors [page]")
+                return
+            
+            # Fetch one extra item to know whether an older page exists
+            page_size = self.TRADES_PAGE_SIZE
+            items = await self._db(getter, limit=page * page_size + 1)
+            has_more = len(items) > page * page_size
+            # Newest first: page 1 walks back from the last item
+            start = len(items) - 1 - (page - 1) * page_size
+            stop = max(-1, start - page_size)
+            
+            parts = [f"{title} (Page {page})\n\n"]
+            if start >= 0:
+                for i, idx in enumerate(range(start, stop, -1), (page - 1) * page_size + 1):
+                    parts.append(f"*#{i}* - {render(items[idx])}")
+                if has_more:
+                    parts.append(f"Older: /trades {trade_type} {page + 1}")
             else:
-                message = "❌ Invalid trade type. Use: /trades successful|failed|errors"
+                parts.append(empty if page == 1 else "No more entries.")
             
-            await update.message.reply_text(message, parse_mode="Markdown")
+            for chunk in _split_message("".join(parts), self.MAX_MESSAGE_CHARS):
+                await update.message.reply_text(chunk, parse_mode="Markdown")
         except Exception as e:
-            print(f"⚠️ Error in trades_command: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("⚠️ Error in trades_command: %s", e)
             await update.message.reply_text("❌ Error getting trade history. Please try again.")
     
     async def duration_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /duration command - Show trade duration stats"""
         try:
-            stats = self.trade_db.get_trade_duration_stats()
+            stats = await self._db(self.trade_db.get_trade_duration_stats)
             
-            message = "⏳ *Trade Duration Stats*\n\n"
+            parts = ["⏳ *Trade Duration Stats*\n\n"]
             
             avg_duration = stats.get("average_duration", 0.0)
             shortest = stats.get("shortest_duration", 0.0)
@@ -511,59 +843,83 @@ Time: {trade_info.get('timestamp', 'N/A')}
             durations = stats.get("durations", [])
             
             if avg_duration > 0:
-                # Convert seconds to human-readable format
-                def format_duration(seconds):
-                    if seconds < 60:
-                        return f"{seconds:.1f}s"
-                    elif seconds < 3600:
-                        minutes = seconds / 60
-                        return f"{minutes:.1f}m"
-                    else:
-                        hours = seconds / 3600
-                        return f"{hours:.1f}h"
-                
-                message += f"*Average Duration:* {format_duration(avg_duration)}\n"
-                message += f"*Shortest Trade:* {format_duration(shortest)}\n"
-                message += f"*Longest Trade:* {format_duration(longest)}\n\n"
+                parts.append(f"*Average Duration:* {_fmt_duration(avg_duration)}\n")
+                parts.append(f"*Shortest Trade:* {_fmt_duration(shortest)}\n")
+                parts.append(f"*Longest Trade:* {_fmt_duration(longest)}\n\n")
                 
                 if durations:
-                    message += "*Last 10 Trades:*\n"
-                    for i, dur in enumerate(reversed(durations[-10:]), 1):
-                        message += f"{i}. {format_duration(dur)}\n"
+                    parts.append("*Last 10 Trades:*\n")
+                    parts.append("".join(
+                        f"{i}. {_fmt_duration(dur)}\n" for i, dur in enumerate(reversed(durations[-10:]), 1)
+                    ))
             else:
-                message += "No duration data available yet."
+                parts.append("No duration data available yet.")
             
+            message = "".join(parts)
             await update.message.reply_text(message, parse_mode="Markdown")
         except Exception as e:
-            print(f"⚠️ Error in duration_command: {e}")
+            logger.exception("⚠️ Error in duration_command: %s", e)
             await update.message.reply_text("❌ Error getting duration stats. Please try again.")
     
-    async def lotsize_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /lotsize command - Show lot size settings"""
-        try:
+    def _render_settings_block(self) -> str:
+        """Render the /dashboard settings section (cached until _invalidate_settings)"""
+        if self._settings_block is None:
+            self._settings_block = (
+                "*Settings:*\n"
+                f"• Lot Size: {Config.LOT_SIZE_MODE} ({Config.LOT_SIZE_VALUE})\n"
+                f"• Slippage: {Config.SLIPPAGE_TOLERANCE}%\n"
+                f"• Tips: {Config.TIPS_AMOUNT} SOL\n\n"
+            )
+        return self._settings_block
+    
+    def _render_lotsize_block(self) -> str:
+        """Render the /lotsize reply (cached until _invalidate_settings)"""
+        if self._lotsize_block is None:
             mode = Config.LOT_SIZE_MODE
             value = Config.LOT_SIZE_VALUE
             
-            message = "⚙️ *Lot Size Settings*\n\n"
-            message += f"*Mode:* {mode}\n"
-            message += f"*Value:* {value}\n\n"
-            
+            parts = [_LOTSIZE_HDR, f"*Mode:* {mode}\n", f"*Value:* {value}\n\n"]
             if mode == "fixed":
-                message += f"Bot will always trade *{value} SOL* regardless of master wallet amount."
+                parts.append(f"Bot will always trade *{value} SOL* regardless of master wallet amount.")
             elif mode == "percentage":
-                message += f"Bot will trade *{value}%* of master wallet amount.\n"
-                message += f"Example: Master trades 1 SOL → You trade {value/100 * 1:.6f} SOL"
+                parts.append(f"Bot will trade *{value}%* of master wallet amount.\n")
+                parts.append(f"Example: Master trades 1 SOL → You trade {value/100 * 1:.6f} SOL")
             elif mode == "multiplier":
-                message += f"Bot will trade *{value}x* of master wallet amount.\n"
-                message += f"Example: Master trades 1 SOL → You trade {value * 1:.6f} SOL"
+                parts.append(f"Bot will trade *{value}x* of master wallet amount.\n")
+                parts.append(f"Example: Master trades 1 SOL → You trade {value * 1:.6f} SOL")
             else:
-                message += f"Unknown mode: {mode}"
-            
-            message += f"\n\nUse /setlotsize to change settings."
-            
-            await update.message.reply_text(message, parse_mode="Markdown")
+                parts.append(f"Unknown mode: {mode}")
+            parts.append("\n\nUse /setlotsize to change settings.")
+            self._lotsize_block = "".join(parts)
+        return self._lotsize_block
+    
+    def _invalidate_settings(self):
+        """Drop rendered settings text after a setting changes"""
+        self._settings_block = None
+        self._lotsize_block = None
+    
+    async def _apply_settings(self, **values):
+        """
+        Change Config settings at runtime and save them (see Config.update_settings)
+        
+        Args:
+            **values: Config.RUNTIME_SETTINGS names and their new values
+        
+        Raises:
+            ValueError: A value was rejected by Config.check_settings (nothing changed)
+        """
+        await asyncio.to_thread(Config.update_settings, **values)
+        if self.copy_trader is not None and ("SLIPPAGE_TOLERANCE" in values or "TIPS_AMOUNT" in values):
+            # SlippageManager is immutable and reads Config when built
+            self.copy_trader.slippage_manager = SlippageManager()
+        self._invalidate_settings()
+    
+    async def lotsize_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /lotsize command - Show lot size settings"""
+        try:
+            await update.message.reply_text(self._render_lotsize_block(), parse_mode="Markdown")
         except Exception as e:
-            print(f"⚠️ Error in lotsize_command: {e}")
+            logger.exception("⚠️ Error in lotsize_command: %s", e)
             await update.message.reply_text("❌ Error getting lot size settings. Please try again.")
     
     async def setlotsize_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -584,34 +940,34 @@ Time: {trade_info.get('timestamp', 'N/A')}
                 await update.message.reply_text("❌ Invalid mode. Use: fixed, percentage, or multiplier")
                 return
             
-            # Note: This should update config file or database
-            # For now, just show confirmation
-            message = f"✅ Lot size updated:\n\n"
-            message += f"*Mode:* {mode}\n"
-            message += f"*Value:* {value}\n\n"
-            message += "⚠️ Note: Changes require bot restart to take effect.\n"
-            message += "Update .env file: LOT_SIZE_MODE={mode} and LOT_SIZE_VALUE={value}"
+            try:
+                await self._apply_settings(LOT_SIZE_MODE=mode, LOT_SIZE_VALUE=value)
+            except ValueError as e:
+                # Out of range, not finite, or wrong type: nothing was changed
+                await update.message.reply_text(f"❌ {e}")
+                return
+            message = _SETLOTSIZE_TEMPLATE.format(mode=mode, value=value)
             
-            await update.message.reply_text(message.format(mode=mode, value=value), parse_mode="Markdown")
+            await update.message.reply_text(message, parse_mode="Markdown")
         except ValueError:
             await update.message.reply_text("❌ Invalid value. Value must be a number.")
         except Exception as e:
-            print(f"⚠️ Error in setlotsize_command: {e}")
+            logger.exception("⚠️ Error in setlotsize_command: %s", e)
             await update.message.reply_text("❌ Error setting lot size. Please try again.")
     
     async def dashboard_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /dashboard command - Show complete dashboard"""
         try:
             stats = self.bot_stats
-            total_pnl = self.trade_db.get_total_pnl()
-            latency_avg = self.trade_db.get_latency_averages()
-            duration_stats = self.trade_db.get_trade_duration_stats()
+            snapshot = await self._db(self.trade_db.get_dashboard_snapshot)
+            total_pnl = snapshot["total_pnl"]
+            latency_avg = snapshot["latency"]
             
-            message = "📊 *Trading Dashboard*\n\n"
+            parts = ["📊 *Trading Dashboard*\n\n"]
             
             # Status
             status_emoji = "🟢" if stats.get("is_running") else "🔴"
-            message += f"🤖 *Status:* {status_emoji} {'Running' if stats.get('is_running') else 'Stopped'}\n\n"
+            parts.append(f"🤖 *Status:* {status_emoji} {'Running' if stats.get('is_running') else 'Stopped'}\n\n")
             
             # Performance
             total = stats.get("total_copies", 0)
@@ -619,60 +975,55 @@ Time: {trade_info.get('timestamp', 'N/A')}
             failed = stats.get("failed_copies", 0)
             success_rate = (successful / total * 100) if total > 0 else 0
             
-            message += f"*Performance:*\n"
-            message += f"• Total Trades: {total}\n"
-            message += f"• Successful: {successful} ({success_rate:.1f}%)\n"
-            message += f"• Failed: {failed}\n"
-            message += f"• Net PnL: {total_pnl.get('net_pnl', 0.0):+.6f} SOL\n"
-            message += f"• ROI: {total_pnl.get('roi', 0.0):+.2f}%\n\n"
+            parts.append(f"*Performance:*\n")
+            parts.append(f"• Total Trades: {total}\n")
+            parts.append(f"• Successful: {successful} ({success_rate:.1f}%)\n")
+            parts.append(f"• Failed: {failed}\n")
+            parts.append(f"• Net PnL: {total_pnl.get('net_pnl', 0.0):+.6f} SOL\n")
+            parts.append(f"• ROI: {total_pnl.get('roi', 0.0):+.2f}%\n\n")
             
             # Latency
             current_latency = latency_avg.get("1min", 0.0) or latency_avg.get("all_time", 0.0)
-            message += f"*Latency:*\n"
-            message += f"• Current: {current_latency:.2f}ms\n"
-            message += f"• 1h Avg: {latency_avg.get('1hour', 0.0):.2f}ms\n"
-            message += f"• 24h Avg: {latency_avg.get('24hours', 0.0):.2f}ms\n"
-            message += f"• Target: <{Config.MAX_LATENCY_MS}ms"
-            if current_latency < Config.MAX_LATENCY_MS:
-                message += " ✅\n\n"
+            parts.append(f"*Latency:*\n")
+            parts.append(f"• Current: {current_latency:.2f}ms\n")
+            parts.append(f"• 1h Avg: {latency_avg.get('1hour', 0.0):.2f}ms\n")
+            parts.append(f"• 24h Avg: {latency_avg.get('24hours', 0.0):.2f}ms\n")
+            max_latency = Config.MAX_LATENCY_MS
+            parts.append(f"• Target: <{max_latency}ms")
+            if current_latency < max_latency:
+                parts.append(" ✅\n\n")
             else:
-                message += " ⚠️\n\n"
+                parts.append(" ⚠️\n\n")
             
             # Settings
-            message += f"*Settings:*\n"
-            message += f"• Lot Size: {Config.LOT_SIZE_MODE} ({Config.LOT_SIZE_VALUE})\n"
-            message += f"• Slippage: {Config.SLIPPAGE_TOLERANCE}%\n"
-            message += f"• Tips: {Config.TIPS_AMOUNT} SOL\n\n"
+            parts.append(self._render_settings_block())
             
             # Recent trades
-            recent_trades = self.trade_db.get_successful_trades(limit=3)
+            recent_trades = snapshot["recent_trades"]
             if recent_trades:
-                message += "*Recent Trades:*\n"
-                for i, trade in enumerate(reversed(recent_trades[-3:]), 1):
-                    pnl = trade.get("pnl", 0.0)
+                parts.append("*Recent Trades:*\n")
+                n = len(recent_trades)
+                for i, idx in enumerate(range(n - 1, -1, -1), 1):
+                    pnl = recent_trades[idx].get("pnl") or 0.0
                     emoji = "✅" if pnl > 0 else "❌" if pnl < 0 else "➖"
-                    message += f"{i}. {emoji} {pnl:+.6f} SOL\n"
+                    parts.append(f"{i}. {emoji} {pnl:+.6f} SOL\n")
             
+            message = "".join(parts)
             await update.message.reply_text(message, parse_mode="Markdown")
         except Exception as e:
-            print(f"⚠️ Error in dashboard_command: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("⚠️ Error in dashboard_command: %s", e)
             await update.message.reply_text("❌ Error getting dashboard data. Please try again.")
     
     async def fees_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /fees command - Show tips & slippage settings"""
         try:
-            message = "💰 *Tips & Slippage Settings*\n\n"
-            message += f"*Slippage Tolerance:* {Config.SLIPPAGE_TOLERANCE}%\n"
-            message += f"*Tips/Priority Fee:* {Config.TIPS_AMOUNT} SOL\n"
-            message += f"*Fee Buffer:* {Config.FEE_BUFFER} SOL\n\n"
-            message += "Use /setslippage <value> to change slippage\n"
-            message += "Use /settips <value> to change tips"
+            message = _FEES_TEMPLATE.format(
+                slip=Config.SLIPPAGE_TOLERANCE, tips=Config.TIPS_AMOUNT, buf=Config.FEE_BUFFER
+            )
             
             await update.message.reply_text(message, parse_mode="Markdown")
         except Exception as e:
-            print(f"⚠️ Error in fees_command: {e}")
+            logger.exception("⚠️ Error in fees_command: %s", e)
             await update.message.reply_text("❌ Error getting fee settings. Please try again.")
     
     async def setslippage_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -684,15 +1035,19 @@ Time: {trade_info.get('timestamp', 'N/A')}
             
             value = float(context.args[0])
             
-            message = f"✅ Slippage updated to {value}%\n\n"
-            message += "⚠️ Note: Changes require bot restart to take effect.\n"
-            message += f"Update .env file: SLIPPAGE_TOLERANCE={value}"
+            try:
+                await self._apply_settings(SLIPPAGE_TOLERANCE=value)
+            except ValueError as e:
+                # Out of range, not finite, or wrong type: nothing was changed
+                await update.message.reply_text(f"❌ {e}")
+                return
+            message = _SETSLIPPAGE_TEMPLATE.format(value=value)
             
             await update.message.reply_text(message, parse_mode="Markdown")
         except ValueError:
             await update.message.reply_text("❌ Invalid value. Value must be a number.")
         except Exception as e:
-            print(f"⚠️ Error in setslippage_command: {e}")
+            logger.exception("⚠️ Error in setslippage_command: %s", e)
             await update.message.reply_text("❌ Error setting slippage. Please try again.")
     
     async def settips_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -704,19 +1059,34 @@ Time: {trade_info.get('timestamp', 'N/A')}
             
             value = float(context.args[0])
             
-            message = f"✅ Tips updated to {value} SOL\n\n"
-            message += "⚠️ Note: Changes require bot restart to take effect.\n"
-            message += f"Update .env file: TIPS_AMOUNT={value}"
+            try:
+                await self._apply_settings(TIPS_AMOUNT=value)
+            except ValueError as e:
+                # Out of range, not finite, or wrong type: nothing was changed
+                await update.message.reply_text(f"❌ {e}")
+                return
+            message = _SETTIPS_TEMPLATE.format(value=value)
             
             await update.message.reply_text(message, parse_mode="Markdown")
         except ValueError:
             await update.message.reply_text("❌ Invalid value. Value must be a number.")
         except Exception as e:
-            print(f"⚠️ Error in settips_command: {e}")
+            logger.exception("⚠️ Error in settips_command: %s", e)
             await update.message.reply_text("❌ Error setting tips. Please try again.")
     
     async def stop(self):
         """Stop Telegram bot"""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        
+        # Let the worker send whatever is still queued (including a batch in flight), within a time limit
+        if self._notif_task and not self._notif_task.done():
+            self._enqueue_notification(_NOTIFY_STOP)
+            try:
+                await asyncio.wait_for(self._notif_task, self.NOTIFY_STOP_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning("⚠️ Timed out sending queued trade notifications at shutdown")
+        
         try:
             await self.send_message("🛑 *Copy Trading Bot Stopped*", parse_mode="Markdown")
         except:
@@ -728,14 +1098,22 @@ Time: {trade_info.get('timestamp', 'N/A')}
                 await self.application.stop()
                 await self.application.shutdown()
             except Exception as e:
-                print(f"⚠️ Error stopping Telegram bot: {e}")
+                logger.warning("⚠️ Error stopping Telegram bot: %s", e)
+        
+        # Close a standalone Bot created by send_message()
+        if self._bot is not None and (self.application is None or self._bot is not self.application.bot):
+            try:
+                await self._bot.shutdown()
+            except Exception as e:
+                logger.warning("⚠️ Error closing Telegram bot session: %s", e)
         
         # Cancel polling task if exists
-        if hasattr(self, '_polling_task'):
+        if self._polling_task is not None:
             try:
                 self._polling_task.cancel()
             except:
                 pass
         
-        print("✅ Telegram bot stopped")
+        logger.info("✅ Telegram bot stopped")
+        _stop_log_listener()
 
@@ -1,59 +1,656 @@
 """
 Trade database for storing all trade data, PnL, latency, duration, and history
 """
+import asyncio
+import atexit
+import gzip
 import json
 import os
+import threading
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import numpy as np
+
+# Try to import orjson (faster JSON parsing/serialization)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _dumps(obj) -> bytes:
+    """Serialize to JSON bytes (values JSON can't represent are stored as str)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=str, option=_ORJSON_OPTS)
+    return json.dumps(obj, default=str).encode()
+
+def _loads(raw):
+    """Parse JSON from bytes or str"""
+    return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
 
 class TradeDatabase:
     """Database for storing and querying trade data"""
     
+    # PnL report granularities: period -> (how far back it reports, bucket label format)
+    PNL_PERIODS = {
+        "hour": (timedelta(hours=24), "%Y-%m-%d %H:00"),
+        "day": (timedelta(days=7), "%Y-%m-%d"),
+        "week": (timedelta(weeks=4), "%Y-W%W"),
+    }
+    
+    LATENCY_CAPACITY = 10000  # latency samples kept (persisted history and ring buffer)
+    # Latency average windows: label -> seconds back from now
+    LATENCY_WINDOWS = {
+        "1min": 60,
+        "15min": 15 * 60,
+        "1hour": 3600,
+        "4hours": 4 * 3600,
+        "24hours": 24 * 3600,
+    }
+    
+    SAVE_BATCH_SIZE = 50  # mutations that force an immediate save
+    SAVE_INTERVAL = 2.0  # seconds a mutation may wait before it is saved
+    COMPACT_EVERY = 1000  # log records before the snapshot is rewritten and the log truncated
+    LOG_BUFFER_SIZE = 64 * 1024
+    SNAPSHOT_KEYS = {"trade": "trades", "failed": "failed_trades", "error": "errors"}
+    SNAPSHOT_COMPRESSLEVEL = 1  # gzip level for the snapshot: cheap CPU, still a large size cut
+    MEMORY_LIMIT = 10000  # trades/errors/failed trades each kept in memory; older ones are archived
+    
     def __init__(self, db_file: str = "trades.json"):
-        self.db_file = db_file
-        self.trades: List[Dict] = []
-        self.errors: List[Dict] = []
-        self.failed_trades: List[Dict] = []
+        self.db_file = db_file  # Uncompressed snapshot from older versions, read if there is no .gz yet
+        self.snapshot_file = db_file + ".gz"  # Snapshot
+        self.log_file = os.path.splitext(db_file)[0] + ".jsonl"  # Append-only log of changes since the snapshot
+        self.rotated_log_file = self.log_file + ".1"  # Log being folded into a new snapshot
+        # Records pushed out of memory: one gzip segment per compaction, named by the snapshot seq
+        self.archive_dir = os.path.splitext(db_file)[0] + "_archive"
+        self.legacy_archive_file = os.path.splitext(db_file)[0] + "_archive.jsonl.gz"  # Older single-file archive
+        self.trades: deque = deque(maxlen=self.MEMORY_LIMIT)
+        self.errors: deque = deque(maxlen=self.MEMORY_LIMIT)
+        self.failed_trades: deque = deque(maxlen=self.MEMORY_LIMIT)
+        self._archive_pending: List[tuple] = []  # (kind, record) evicted since the last compaction
+        self._trade_index: Dict[str, Dict] = {}  # trade_id -> trade (first one recorded with that id)
+        
+        # Running PnL counters, updated as trades are recorded:
+        # period -> bucket label -> [counters, newest trade time in bucket (epoch seconds)]
+        self._pnl_buckets: Dict[str, Dict[str, list]] = {period: {} for period in (*self.PNL_PERIODS, "total")}
+        self._total_invested = 0.0
+        # Running duration aggregates over trades with a duration_seconds
+        self._dur_sum = 0.0
+        self._dur_count = 0
+        self._dur_min = float("inf")
+        self._dur_max = float("-inf")
+        self._dur_bounds_stale = False  # min/max need a rescan after a duration was replaced
+        # What archived trades add to the aggregates above (their values can no longer change);
+        # saved in the snapshot so startup never has to read the archive
+        self._archived = self._empty_archived_stats()
+        
+        # Latency tracking (for time-based averages): ring buffer, persisted as two flat lists
+        self._lat = np.zeros(self.LATENCY_CAPACITY, dtype=np.float32)
+        self._lat_ts = np.zeros(self.LATENCY_CAPACITY, dtype=np.float64)  # epoch seconds
+        self._lat_idx = 0  # total samples written; next slot is _lat_idx % LATENCY_CAPACITY
+        
+        # Write batching: mutations append to the log buffer, flush() writes it out
+        self._dirty = False
+        self._pending_writes = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._seq = 0  # Sequence number of the last change (snapshot or log)
+        self._log_records = 0  # Records in the log file since the last compaction
+        self._compacting = False  # A compaction job is queued or running
+        self._io_lock = threading.Lock()  # Serializes background writes with a blocking flush()
+        # One worker, so background flush jobs run in the order they were taken
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trade-db-io")
         
         # Load existing data
-        self._load_data()
+        needs_compaction = self._load_data()
+        self._rebuild_pnl_index()
         
-        # Latency tracking (for time-based averages)
-        self.latency_history = deque(maxlen=10000)  # Store last 10000 latencies with timestamps
+        if os.path.exists(self.rotated_log_file):
+            # A compaction was interrupted: both logs were replayed above, fold them into a snapshot now
+            if self._write_compaction(self._archive_pending[:], self._snapshot_data()):
+                for log_file in (self.rotated_log_file, self.log_file):
+                    if os.path.exists(log_file):
+                        os.remove(log_file)
+                self._log_records = 0
+                needs_compaction = False
+        self._log = open(self.log_file, "ab", buffering=self.LOG_BUFFER_SIZE)
+        if needs_compaction:
+            self.flush(compact=True)
+        atexit.register(self.flush)
         
-    def _load_data(self):
-        """Load data from JSON file"""
-        if os.path.exists(self.db_file):
+    def _load_data(self) -> bool:
+        """
+        Load the JSON snapshot, then replay the change log on top of it
+        
+        Returns:
+            True if the snapshot should be rewritten right away (older format or overflow to archive)
+        """
+        needs_compaction = False
+        replay_archives = True
+        snapshot_file = self.snapshot_file if os.path.exists(self.snapshot_file) else self.db_file
+        if os.path.exists(snapshot_file):
             try:
-                with open(self.db_file, 'r') as f:
-                    data = json.load(f)
-                    self.trades = data.get("trades", [])
-                    self.errors = data.get("errors", [])
-                    self.failed_trades = data.get("failed_trades", [])
+                opener = gzip.open if snapshot_file.endswith(".gz") else open
+                with opener(snapshot_file, 'rb') as f:
+                    data = _loads(f.read())
+                    if "archived" in data:
+                        self._archived = self._decode_archived_stats(data["archived"])
+                    else:
+                        # Snapshot from before the archive stats were saved: count the old archive once.
+                        # That version archived evictions at every flush, so replayed ones already are.
+                        for trade in self._iter_legacy_archive():
+                            self._count_archived(trade)
+                        needs_compaction = True
+                        replay_archives = False
+                    for kind, records in self._record_lists():
+                        for record in data.get(self.SNAPSHOT_KEYS[kind], []):
+                            self._append_record(kind, records, record)
+                    self._seq = data.get("seq", 0)
                     
-                    # Load latency history
-                    latency_data = data.get("latency_history", [])
-                    self.latency_history = deque(latency_data, maxlen=10000)
+                    self._load_latency(data)
+                self._drop_unsnapshotted_segments()
             except Exception as e:
                 print(f"⚠️ Error loading trade database: {e}")
-                self.trades = []
-                self.errors = []
-                self.failed_trades = []
+                self.trades.clear()
+                self.errors.clear()
+                self.failed_trades.clear()
+                self._archive_pending.clear()
+                self._archived = self._empty_archived_stats()
+        # More than MEMORY_LIMIT records in the snapshot: archive the overflow and trim it
+        needs_compaction = needs_compaction or bool(self._archive_pending)
+        
+        for trade in self.trades:
+            self._trade_index.setdefault(trade.get("trade_id"), trade)
+        
+        # A rotated log exists only if the process stopped mid-compaction; it is older than log_file
+        for log_file in (self.rotated_log_file, self.log_file):
+            if os.path.exists(log_file):
+                try:
+                    self._replay_log(log_file, replay_archives)
+                except Exception as e:
+                    print(f"⚠️ Error replaying trade log: {e}")
+        return needs_compaction
+    
+    def _replay_log(self, log_file: str, archive: bool = True):
+        """Apply log records newer than the snapshot (archive: see _apply_log_record)"""
+        snapshot_seq = self._seq
+        with open(log_file, 'rb') as f:
+            for line in f:
+                try:
+                    record = _loads(line)
+                except ValueError:
+                    continue  # Torn last line from a crash mid-write
+                self._log_records += 1
+                if record.get("seq", 0) <= snapshot_seq:
+                    continue  # Already in the snapshot (crash between snapshot and truncate)
+                self._apply_log_record(record, archive)
+                self._seq = record["seq"]
+    
+    def _apply_log_record(self, record: Dict, archive: bool = True):
+        """
+        Re-apply one logged change to the in-memory lists
+        
+        Args:
+            record: Log record
+            archive: Archive records it evicts. Only compactions up to the
+                snapshot's seq reached the archive, so evictions after it are
+                archived again (False for logs from the older flush-time archive)
+        """
+        op = record.get("op")
+        if op == "trade":
+            trade = record["data"]
+            self._append_record("trade", self.trades, trade, archive)
+            self._trade_index.setdefault(trade.get("trade_id"), trade)
+            self._push_latency(self._trade_epoch(trade), trade.get("latency_ms", 0.0))
+        elif op == "exit":
+            trade = self._trade_index.get(record["trade_id"])
+            if trade is not None:
+                trade.update(record["fields"])
+        elif op == "failed":
+            self._append_record("failed", self.failed_trades, record["data"], archive)
+        elif op == "error":
+            self._append_record("error", self.errors, record["data"], archive)
+    
+    def _record_lists(self):
+        """(kind, in-memory deque) for each record type"""
+        return (("trade", self.trades), ("failed", self.failed_trades), ("error", self.errors))
+    
+    def _append_record(self, kind: str, records: deque, record: Dict, archive: bool = True):
+        """Append to a bounded in-memory list, archiving the record it pushes out"""
+        if len(records) == records.maxlen:
+            evicted = records[0]
+            if archive:
+                self._archive_pending.append((kind, evicted))
+            if kind == "trade":
+                self._forget_trade(evicted, archive)
+        records.append(record)
+    
+    def _forget_trade(self, trade: Dict, count: bool = True):
+        """Drop an archived trade from the id index and (if count) add it to the archived stats"""
+        trade_id = trade.get("trade_id")
+        if self._trade_index.get(trade_id) is trade:
+            del self._trade_index[trade_id]
+        if count:
+            self._count_archived(trade)
+    
+    def _empty_archived_stats(self) -> Dict:
+        """Archived-trade aggregates with nothing counted yet"""
+        return {
+            "pnl_buckets": {period: {} for period in (*self.PNL_PERIODS, "total")},
+            "invested": 0.0,
+            "dur_sum": 0.0,
+            "dur_count": 0,
+            "dur_min": None,  # None while no archived trade has a duration
+            "dur_max": None
+        }
+    
+    def _decode_archived_stats(self, saved: Dict) -> Dict:
+        """Archived-trade aggregates from a snapshot, with defaults for missing parts"""
+        archived = self._empty_archived_stats()
+        for period, buckets in saved.get("pnl_buckets", {}).items():
+            if period in archived["pnl_buckets"]:
+                archived["pnl_buckets"][period] = {label: list(entry) for label, entry in buckets.items()}
+        for key in ("invested", "dur_sum", "dur_count", "dur_min", "dur_max"):
+            archived[key] = saved.get(key, archived[key])
+        return archived
+    
+    def _copy_archived_stats(self) -> Dict:
+        """Copy of the archived-trade aggregates that later evictions won't change"""
+        archived = dict(self._archived)
+        archived["pnl_buckets"] = {
+            period: {label: [dict(counters), newest] for label, (counters, newest) in buckets.items()}
+            for period, buckets in self._archived["pnl_buckets"].items()
+        }
+        return archived
+    
+    def _count_archived(self, trade: Dict):
+        """Add an evicted trade to the archived-trade aggregates"""
+        archived = self._archived
+        for counters, _ in self._pnl_entries(trade, create=True, root=archived["pnl_buckets"]):
+            counters["trades"] += 1
+            self._add_pnl(counters, trade.get("pnl"))
+        archived["invested"] += trade.get("amount_in", 0.0)
+        duration = trade.get("duration_seconds")
+        if duration is not None:
+            archived["dur_sum"] += duration
+            archived["dur_count"] += 1
+            if archived["dur_min"] is None or duration < archived["dur_min"]:
+                archived["dur_min"] = duration
+            if archived["dur_max"] is None or duration > archived["dur_max"]:
+                archived["dur_max"] = duration
+    
+    def _segment_file(self, seq: int) -> str:
+        """Archive segment written by the compaction that produced snapshot seq"""
+        return os.path.join(self.archive_dir, f"{seq:012d}.jsonl.gz")
+    
+    def _write_compaction(self, archive: List[tuple], snapshot: Dict) -> bool:
+        """
+        Write evicted records as an archive segment, then the snapshot that no longer holds them
+        
+        Until the snapshot is on disk the records are still in the old snapshot
+        and log, so a segment newer than the snapshot is discarded on the next
+        start (_drop_unsnapshotted_segments) and nothing is counted twice.
+        Runs under _io_lock, or before any background write exists.
+        
+        Args:
+            archive: (kind, record) pairs taken from the front of _archive_pending
+            snapshot: State from _snapshot_data()
+        
+        Returns:
+            True if both were written
+        """
+        if archive:
+            try:
+                os.makedirs(self.archive_dir, exist_ok=True)
+                self._write_gzip(
+                    self._segment_file(snapshot["seq"]),
+                    b"".join(_dumps({"kind": kind, "data": record}) + b"\n" for kind, record in archive)
+                )
+            except Exception as e:
+                print(f"⚠️ Error writing trade archive: {e}")
+                return False
+        if not self._save_data(snapshot):
+            return False
+        # Evictions made since the snapshot was taken stay queued for the next compaction
+        del self._archive_pending[:len(archive)]
+        return True
     
-    def _save_data(self):
-        """Save data to JSON file"""
+    def _drop_unsnapshotted_segments(self):
+        """Delete archive segments (and temp files) newer than the loaded snapshot"""
+        if not os.path.isdir(self.archive_dir):
+            return
         try:
-            data = {
-                "trades": self.trades,
-                "errors": self.errors,
-                "failed_trades": self.failed_trades,
-                "latency_history": list(self.latency_history)
-            }
-            with open(self.db_file, 'w') as f:
-                json.dump(data, f, indent=2, default=str)
+            for name in os.listdir(self.archive_dir):
+                seq = name.split(".", 1)[0]
+                if name.endswith(".tmp") or (seq.isdigit() and int(seq) > self._seq):
+                    os.remove(os.path.join(self.archive_dir, name))
+        except OSError as e:
+            print(f"⚠️ Error cleaning trade archive: {e}")
+    
+    def _iter_legacy_archive(self):
+        """Yield trades from the single-file archive of older versions, oldest first"""
+        if not os.path.exists(self.legacy_archive_file):
+            return
+        try:
+            with gzip.open(self.legacy_archive_file, "rb") as f:
+                for line in f:
+                    try:
+                        record = _loads(line)
+                    except ValueError:
+                        continue
+                    if record.get("kind") == "trade":
+                        yield record["data"]
+        except (EOFError, OSError) as e:
+            print(f"⚠️ Error reading {self.legacy_archive_file}, later records are not counted: {e}")
+    
+    def _append_log(self, op: str, **fields):
+        """Append one change record to the log buffer"""
+        self._seq += 1
+        self._log.write(_dumps({"seq": self._seq, "op": op, **fields}) + b"\n")
+        self._log_records += 1
+        self._mark_dirty()
+    
+    def _snapshot_data(self) -> Dict:
+        """Copy the state a snapshot needs (cheap list copies, taken on the mutating thread)"""
+        return {
+            "seq": self._seq,
+            "trades": list(self.trades),
+            "errors": list(self.errors),
+            "failed_trades": list(self.failed_trades),
+            "archived": self._copy_archived_stats(),
+            **self._latency_lists()
+        }
+    
+    def _write_gzip(self, path: str, payload: bytes):
+        """Write a gzip file atomically: temp file, fsync, then rename over path"""
+        tmp_file = path + ".tmp"
+        with open(tmp_file, 'wb') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=self.SNAPSHOT_COMPRESSLEVEL) as f:
+                f.write(payload)
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp_file, path)
+    
+    def _save_data(self, data: Dict) -> bool:
+        """Save a full snapshot to the gzipped JSON file (written to a temp file, then renamed over it)"""
+        try:
+            self._write_gzip(self.snapshot_file, _dumps(data))
+            return True
         except Exception as e:
             print(f"⚠️ Error saving trade database: {e}")
+            return False
+    
+    def _mark_dirty(self):
+        """Record a mutation; it is saved after SAVE_BATCH_SIZE mutations or SAVE_INTERVAL seconds"""
+        self._dirty = True
+        self._pending_writes += 1
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop to defer to (scripts, tests): save right away
+            self.flush()
+            return
+        if self._pending_writes >= self.SAVE_BATCH_SIZE:
+            self._flush_in_background()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.SAVE_INTERVAL, self._flush_in_background)
+    
+    def _flush_in_background(self):
+        """Run pending disk writes on the I/O thread so the event loop never blocks on them"""
+        job = self._take_flush_job()
+        if job is not None:
+            asyncio.get_running_loop().run_in_executor(self._executor, job)
+    
+    def flush(self, compact: bool = False):
+        """
+        Write pending changes to disk now (blocking)
+        
+        Args:
+            compact: Rewrite the snapshot even if the log is still short
+        """
+        job = self._take_flush_job(compact)
+        if job is not None:
+            job()
+    
+    def _take_flush_job(self, compact: bool = False):
+        """
+        Collect pending writes; called on the thread that mutates the database
+        
+        Once the log is long, it is rotated to rotated_log_file and a snapshot
+        of the current state is taken; the rotated log is deleted after the
+        snapshot is on disk, so a crash in between loses nothing. If that
+        compaction failed, the rotated log is still there and the next one
+        retries it without rotating again (log records the snapshot covers
+        are skipped on load).
+        
+        Returns:
+            Blocking callable that performs the writes, or None if nothing is pending
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._dirty and not compact:
+            return None
+        self._dirty = False
+        self._pending_writes = 0
+        
+        log = self._log
+        rotated = False
+        snapshot = None
+        archive = None
+        compact = compact or self._log_records >= self.COMPACT_EVERY
+        if compact and not self._compacting:
+            if not os.path.exists(self.rotated_log_file):
+                # New records go to a fresh log; the snapshot covers everything up to here
+                os.replace(self.log_file, self.rotated_log_file)
+                self._log = open(self.log_file, "ab", buffering=self.LOG_BUFFER_SIZE)
+                self._log_records = 0
+                rotated = True
+            self._compacting = True
+            snapshot = self._snapshot_data()
+            archive = self._archive_pending[:]
+        
+        def write():
+            with self._io_lock:
+                try:
+                    # A blocking flush() can overtake a queued job; if it already
+                    # rotated and closed this log, its records are on disk
+                    if not log.closed:
+                        # One fsync per batch: records are durable at batch boundaries
+                        log.flush()
+                        os.fsync(log.fileno())
+                        if rotated:
+                            log.close()
+                except Exception as e:
+                    print(f"⚠️ Error writing trade log: {e}")
+                if snapshot is not None:
+                    try:
+                        if self._write_compaction(archive, snapshot):
+                            os.remove(self.rotated_log_file)
+                    except OSError as e:
+                        # The snapshot covers it, so a leftover rotated log only costs a replay
+                        print(f"⚠️ Error removing {self.rotated_log_file}: {e}")
+                    finally:
+                        self._compacting = False
+        
+        return write
+    
+    @staticmethod
+    def _add_pnl(counters: Dict, pnl: Optional[float], sign: int = 1):
+        """Add (sign=1) or remove (sign=-1) a trade's PnL from bucket counters"""
+        if pnl:
+            if pnl > 0:
+                counters["profit"] += sign * pnl
+            else:
+                counters["loss"] += sign * abs(pnl)
+            counters["net_pnl"] += sign * pnl
+    
+    @staticmethod
+    def _trade_epoch(record: Dict) -> float:
+        """Epoch seconds of a record, parsed once and kept in its ts_epoch field"""
+        epoch = record.get("ts_epoch")
+        if epoch is None:
+            # Records saved before ts_epoch existed
+            epoch = record["ts_epoch"] = datetime.fromisoformat(record["timestamp"]).timestamp()
+        return epoch
+    
+    def _pnl_entries(self, trade: Dict, create: bool = False, root: Optional[Dict] = None):
+        """
+        Yield the [counters, newest time] entry of every bucket a trade belongs to
+        
+        Args:
+            trade: Trade record
+            create: Add missing buckets (evicting ones past their report window)
+            root: period -> buckets to use instead of _pnl_buckets
+        """
+        if root is None:
+            root = self._pnl_buckets
+        trade_epoch = self._trade_epoch(trade)
+        trade_time = datetime.fromtimestamp(trade_epoch)
+        keys = [(period, trade_time.strftime(fmt)) for period, (_, fmt) in self.PNL_PERIODS.items()]
+        keys.append(("total", "total"))
+        
+        for period, label in keys:
+            buckets = root[period]
+            entry = buckets.get(label)
+            if entry is None:
+                if not create:
+                    continue  # Bucket already aged out of its report window
+                if period in self.PNL_PERIODS:
+                    self._evict_pnl_buckets(period, buckets)
+                entry = buckets[label] = [{"trades": 0, "profit": 0.0, "loss": 0.0, "net_pnl": 0.0}, trade_epoch]
+            elif trade_epoch > entry[1]:
+                entry[1] = trade_epoch
+            yield entry
+    
+    def _evict_pnl_buckets(self, period: str, buckets: Dict):
+        """Drop buckets whose newest trade is older than the period's report window"""
+        cutoff = time.time() - self.PNL_PERIODS[period][0].total_seconds()
+        for label in [label for label, (_, newest) in buckets.items() if newest < cutoff]:
+            del buckets[label]
+    
+    def _index_trade(self, trade: Dict):
+        """Count a new trade in the running PnL counters"""
+        for counters, _ in self._pnl_entries(trade, create=True):
+            counters["trades"] += 1
+            self._add_pnl(counters, trade.get("pnl"))
+        self._total_invested += trade.get("amount_in", 0.0)
+        self._add_duration(trade.get("duration_seconds"))
+    
+    def _add_duration(self, duration: Optional[float]):
+        """Count a trade duration in the running aggregates"""
+        if duration is None:
+            return
+        self._dur_sum += duration
+        self._dur_count += 1
+        if duration < self._dur_min:
+            self._dur_min = duration
+        if duration > self._dur_max:
+            self._dur_max = duration
+    
+    def _remove_duration(self, duration: Optional[float]):
+        """Take a replaced trade duration back out of the running aggregates"""
+        if duration is None:
+            return
+        self._dur_sum -= duration
+        self._dur_count -= 1
+        if duration in (self._dur_min, self._dur_max):
+            self._dur_bounds_stale = True
+    
+    def _refresh_duration_bounds(self):
+        """Rescan min/max after the duration holding one of them was replaced (mutating thread only)"""
+        durations = [t["duration_seconds"] for t in self.trades if t.get("duration_seconds") is not None]
+        durations += [d for d in (self._archived["dur_min"], self._archived["dur_max"]) if d is not None]
+        self._dur_min = min(durations, default=float("inf"))
+        self._dur_max = max(durations, default=float("-inf"))
+        self._dur_bounds_stale = False
+    
+    def _rebuild_pnl_index(self):
+        """Recompute the running PnL counters: archived stats plus the trades in memory"""
+        archived = self._copy_archived_stats()
+        self._pnl_buckets = archived["pnl_buckets"]
+        self._total_invested = archived["invested"]
+        self._dur_sum = archived["dur_sum"]
+        self._dur_count = archived["dur_count"]
+        self._dur_min = float("inf") if archived["dur_min"] is None else archived["dur_min"]
+        self._dur_max = float("-inf") if archived["dur_max"] is None else archived["dur_max"]
+        self._dur_bounds_stale = False
+        for trade in self.trades:
+            self._index_trade(trade)
+    
+    def _push_latency(self, epoch: float, latency_ms: float):
+        """Write one sample into the latency ring buffer"""
+        slot = self._lat_idx % self.LATENCY_CAPACITY
+        self._lat_ts[slot] = epoch
+        self._lat[slot] = latency_ms
+        self._lat_idx += 1
+    
+    def _load_latency(self, data: Dict):
+        """Fill the latency ring buffer from a snapshot (oldest sample first)"""
+        if "latency_ts" in data:
+            timestamps = data["latency_ts"]
+            latencies = data.get("latency_ms", [])
+        else:
+            # Snapshots from older versions: list of {"timestamp": iso, "latency_ms": ...}
+            timestamps, latencies = [], []
+            for entry in data.get("latency_history", []):
+                try:
+                    timestamps.append(datetime.fromisoformat(entry["timestamp"]).timestamp())
+                except (KeyError, TypeError, ValueError):
+                    continue
+                latencies.append(entry.get("latency_ms", 0.0))
+        count = min(len(timestamps), len(latencies), self.LATENCY_CAPACITY)
+        if count:
+            self._lat_ts[:count] = timestamps[len(timestamps) - count:]
+            self._lat[:count] = latencies[len(latencies) - count:]
+        self._lat_idx = count
+    
+    def _latency_lists(self) -> Dict:
+        """Latency ring buffer as flat lists in insertion order, for the snapshot"""
+        count = min(self._lat_idx, self.LATENCY_CAPACITY)
+        slot = self._lat_idx % self.LATENCY_CAPACITY
+        order = np.arange(slot - count, slot) % self.LATENCY_CAPACITY
+        return {
+            "latency_ts": self._lat_ts[order].tolist(),
+            "latency_ms": self._lat[order].tolist()
+        }
+    
+    def _latency_means(self, labels) -> Dict:
+        """
+        Average latency over the given LATENCY_WINDOWS labels plus all time
+        
+        Args:
+            labels: Keys of LATENCY_WINDOWS to compute
+        
+        Returns:
+            Dictionary of label -> average latency (0.0 when the window is empty)
+        """
+        averages = dict.fromkeys(labels, 0.0)
+        averages["all_time"] = 0.0
+        count = min(self._lat_idx, self.LATENCY_CAPACITY)
+        if not count:
+            return averages
+        
+        # Copy so a concurrent append can't change the arrays mid-computation
+        lat = self._lat[:count].copy()
+        ts = self._lat_ts[:count].copy()
+        
+        # One pass: bucket each sample by the narrowest window it falls in,
+        # then the windows are nested, so each is a cumulative sum of buckets
+        labels = sorted(labels, key=self.LATENCY_WINDOWS.get)
+        edges = np.array([self.LATENCY_WINDOWS[label] for label in labels], dtype=np.float64)
+        buckets = np.searchsorted(edges, time.time() - ts)
+        sums = np.cumsum(np.bincount(buckets, weights=lat, minlength=len(edges) + 1))
+        counts = np.cumsum(np.bincount(buckets, minlength=len(edges) + 1))
+        for i, label in enumerate(labels):
+            if counts[i]:
+                averages[label] = float(sums[i] / counts[i])
+        averages["all_time"] = float(sums[-1] / counts[-1])
+        return averages
     
     def add_successful_trade(
         self,
@@ -73,9 +670,12 @@ class TradeDatabase:
         your_amount: Optional[float] = None
     ):
         """Add a successful trade"""
+        iso = timestamp.isoformat()
         trade = {
             "trade_id": trade_id,
-            "timestamp": timestamp.isoformat(),
+            "timestamp": iso,
+            "time_str": iso[11:19],  # Display time (HH:MM:SS); slicing the ISO string beats strftime
+            "ts_epoch": timestamp.timestamp(),  # For time-window math without re-parsing
             "token_in": token_in,
             "token_out": token_out,
             "amount_in": amount_in,
@@ -93,15 +693,13 @@ class TradeDatabase:
             "pnl_percentage": None
         }
         
-        self.trades.append(trade)
+        self._append_record("trade", self.trades, trade)
+        self._trade_index.setdefault(trade_id, trade)
+        self._index_trade(trade)
         
-        # Add to latency history
-        self.latency_history.append({
-            "timestamp": timestamp.isoformat(),
-            "latency_ms": latency_ms
-        })
+        self._push_latency(trade["ts_epoch"], latency_ms)
         
-        self._save_data()
+        self._append_log("trade", data=trade)
         return trade
     
     def update_trade_exit(
@@ -112,28 +710,42 @@ class TradeDatabase:
         duration_seconds: float
     ):
         """Update trade with exit information and calculate PnL"""
-        for trade in self.trades:
-            if trade.get("trade_id") == trade_id:
-                trade["exit_price"] = exit_price
-                trade["exit_timestamp"] = exit_timestamp.isoformat()
-                trade["duration_seconds"] = duration_seconds
-                
-                # Calculate PnL
-                if trade.get("entry_price") and exit_price:
-                    if trade.get("is_buy", True):
-                        # Buy: Profit if exit > entry
-                        pnl = (exit_price - trade["entry_price"]) * trade.get("amount_in", 0)
-                    else:
-                        # Sell: Profit if entry > exit
-                        pnl = (trade["entry_price"] - exit_price) * trade.get("amount_in", 0)
-                    
-                    trade["pnl"] = pnl
-                    if trade["entry_price"] > 0:
-                        trade["pnl_percentage"] = (pnl / (trade["entry_price"] * trade.get("amount_in", 1))) * 100
-                
-                self._save_data()
-                return trade
-        return None
+        trade = self._trade_index.get(trade_id)
+        if trade is None:
+            # Unknown, or already archived (archived trades are final)
+            print(f"⚠️ Exit for trade {trade_id} not recorded: trade not in memory")
+            return None
+        old_pnl = trade.get("pnl")
+        self._remove_duration(trade.get("duration_seconds"))
+        trade["exit_price"] = exit_price
+        trade["exit_timestamp"] = exit_timestamp.isoformat()
+        trade["duration_seconds"] = duration_seconds
+        self._add_duration(duration_seconds)
+        if self._dur_bounds_stale:
+            self._refresh_duration_bounds()
+        
+        # Calculate PnL
+        if trade.get("entry_price") and exit_price:
+            if trade.get("is_buy", True):
+                # Buy: Profit if exit > entry
+                pnl = (exit_price - trade["entry_price"]) * trade.get("amount_in", 0)
+            else:
+                # Sell: Profit if entry > exit
+                pnl = (trade["entry_price"] - exit_price) * trade.get("amount_in", 0)
+            
+            trade["pnl"] = pnl
+            if trade["entry_price"] > 0:
+                trade["pnl_percentage"] = (pnl / (trade["entry_price"] * trade.get("amount_in", 1))) * 100
+        
+        for counters, _ in self._pnl_entries(trade):
+            self._add_pnl(counters, old_pnl, -1)
+            self._add_pnl(counters, trade.get("pnl"))
+        
+        self._append_log("exit", trade_id=trade_id, fields={
+            key: trade.get(key)
+            for key in ("exit_price", "exit_timestamp", "duration_seconds", "pnl", "pnl_percentage")
+        })
+        return trade
     
     def add_failed_trade(
         self,
@@ -143,16 +755,19 @@ class TradeDatabase:
         trade_info: Optional[Dict] = None
     ):
         """Add a failed/non-executed trade"""
+        iso = timestamp.isoformat()
         failed = {
-            "timestamp": timestamp.isoformat(),
+            "timestamp": iso,
+            "time_str": iso[11:19],
+            "ts_epoch": timestamp.timestamp(),
             "reason": reason,
             "master_amount": master_amount,
             "trade_info": trade_info,
             "status": "failed"
         }
         
-        self.failed_trades.append(failed)
-        self._save_data()
+        self._append_record("failed", self.failed_trades, failed)
+        self._append_log("failed", data=failed)
         return failed
     
     def add_error(
@@ -164,147 +779,82 @@ class TradeDatabase:
         context: Optional[Dict] = None
     ):
         """Add an error with potential cause"""
+        iso = timestamp.isoformat()
         error = {
-            "timestamp": timestamp.isoformat(),
+            "timestamp": iso,
+            "time_str": iso[11:19],
+            "ts_epoch": timestamp.timestamp(),
             "error_message": error_message,
             "error_type": error_type,
             "potential_cause": potential_cause,
             "context": context
         }
         
-        self.errors.append(error)
-        self._save_data()
+        self._append_record("error", self.errors, error)
+        self._append_log("error", data=error)
         return error
     
+    @staticmethod
+    def _newest(records: deque, limit: int) -> List[Dict]:
+        """Last `limit` records, oldest first, without walking the whole deque"""
+        newest = list(islice(reversed(records), limit))
+        newest.reverse()
+        return newest
+    
     def get_successful_trades(self, limit: int = 20) -> List[Dict]:
         """Get list of successful trades"""
-        return self.trades[-limit:] if len(self.trades) > limit else self.trades
+        return self._newest(self.trades, limit)
     
     def get_failed_trades(self, limit: int = 20) -> List[Dict]:
         """Get list of failed trades"""
-        return self.failed_trades[-limit:] if len(self.failed_trades) > limit else self.failed_trades
+        return self._newest(self.failed_trades, limit)
     
     def get_errors(self, limit: int = 20) -> List[Dict]:
         """Get list of errors"""
-        return self.errors[-limit:] if len(self.errors) > limit else self.errors
+        return self._newest(self.errors, limit)
     
     def get_pnl_by_period(self, period: str = "day") -> Dict:
         """
         Get PnL by time period
         
+        Reads the running counters kept by _index_trade, so this does not
+        scan the trade history. A bucket is reported while its newest trade
+        is inside the period's window.
+        
         Args:
-            period: "hour", "day", "week"
+            period: "hour", "day", "week" (anything else reports the total)
         
         Returns:
             Dictionary with PnL data
         """
-        now = datetime.now()
-        
-        if period == "hour":
-            cutoff = now - timedelta(hours=24)
-            group_by = lambda dt: dt.strftime("%Y-%m-%d %H:00")
-        elif period == "day":
-            cutoff = now - timedelta(days=7)
-            group_by = lambda dt: dt.strftime("%Y-%m-%d")
-        elif period == "week":
-            cutoff = now - timedelta(weeks=4)
-            group_by = lambda dt: dt.strftime("%Y-W%W")
+        window = self.PNL_PERIODS.get(period)
+        if window is None:
+            period = "total"
+            cutoff = float("-inf")
         else:
-            cutoff = datetime.min
-            group_by = lambda dt: "total"
-        
-        # Filter trades by period
-        period_trades = [
-            trade for trade in self.trades
-            if datetime.fromisoformat(trade["timestamp"]) >= cutoff
-        ]
-        
-        # Group by period
-        pnl_by_period = {}
-        for trade in period_trades:
-            trade_time = datetime.fromisoformat(trade["timestamp"])
-            period_key = group_by(trade_time)
-            
-            if period_key not in pnl_by_period:
-                pnl_by_period[period_key] = {
-                    "trades": 0,
-                    "profit": 0.0,
-                    "loss": 0.0,
-                    "net_pnl": 0.0
-                }
-            
-            pnl_by_period[period_key]["trades"] += 1
-            
-            pnl = trade.get("pnl", 0.0)
-            if pnl:
-                if pnl > 0:
-                    pnl_by_period[period_key]["profit"] += pnl
-                else:
-                    pnl_by_period[period_key]["loss"] += abs(pnl)
-                
-                pnl_by_period[period_key]["net_pnl"] += pnl
+            cutoff = time.time() - window[0].total_seconds()
         
-        return pnl_by_period
+        # list() copies in one step, so a trade recorded meanwhile can't break the loop
+        return {
+            label: dict(counters)
+            for label, (counters, newest) in list(self._pnl_buckets[period].items())
+            if newest >= cutoff
+        }
+    
+    def get_pnl_snapshot(self, period: str = "day") -> Dict:
+        """Get get_pnl_by_period(period) and get_total_pnl() in one call"""
+        return {
+            "by_period": self.get_pnl_by_period(period),
+            "total": self.get_total_pnl()
+        }
     
     def get_latency_averages(self) -> Dict:
         """Get latency averages by time period"""
-        now = datetime.now()
-        
-        averages = {
-            "1min": 0.0,
-            "15min": 0.0,
-            "1hour": 0.0,
-            "4hours": 0.0,
-            "24hours": 0.0,
-            "all_time": 0.0
-        }
-        
-        if not self.latency_history:
-            return averages
-        
-        # Get latencies for each period
-        latencies_1min = []
-        latencies_15min = []
-        latencies_1hour = []
-        latencies_4hours = []
-        latencies_24hours = []
-        all_latencies = []
-        
-        for entry in self.latency_history:
-            entry_time = datetime.fromisoformat(entry["timestamp"])
-            latency = entry["latency_ms"]
-            all_latencies.append(latency)
-            
-            if entry_time >= now - timedelta(minutes=1):
-                latencies_1min.append(latency)
-            if entry_time >= now - timedelta(minutes=15):
-                latencies_15min.append(latency)
-            if entry_time >= now - timedelta(hours=1):
-                latencies_1hour.append(latency)
-            if entry_time >= now - timedelta(hours=4):
-                latencies_4hours.append(latency)
-            if entry_time >= now - timedelta(hours=24):
-                latencies_24hours.append(latency)
-        
-        # Calculate averages
-        if latencies_1min:
-            averages["1min"] = sum(latencies_1min) / len(latencies_1min)
-        if latencies_15min:
-            averages["15min"] = sum(latencies_15min) / len(latencies_15min)
-        if latencies_1hour:
-            averages["1hour"] = sum(latencies_1hour) / len(latencies_1hour)
-        if latencies_4hours:
-            averages["4hours"] = sum(latencies_4hours) / len(latencies_4hours)
-        if latencies_24hours:
-            averages["24hours"] = sum(latencies_24hours) / len(latencies_24hours)
-        if all_latencies:
-            averages["all_time"] = sum(all_latencies) / len(all_latencies)
-        
-        return averages
+        return self._latency_means(self.LATENCY_WINDOWS)
     
     def get_trade_duration_stats(self) -> Dict:
         """Get trade duration statistics"""
-        if not self.trades:
+        if not self._dur_count:
             return {
                 "average_duration": 0.0,
                 "shortest_duration": 0.0,
@@ -312,30 +862,30 @@ class TradeDatabase:
                 "durations": []
             }
         
-        durations = [
-            trade.get("duration_seconds", 0.0)
-            for trade in self.trades
-            if trade.get("duration_seconds") is not None
-        ]
+        # Read-only here: this runs in a worker thread while the trader mutates the aggregates
+        trades = tuple(self.trades)
         
-        if not durations:
-            return {
-                "average_duration": 0.0,
-                "shortest_duration": 0.0,
-                "longest_duration": 0.0,
-                "durations": []
-            }
+        # Last 10 durations, walking back from the newest trade
+        recent = []
+        for trade in reversed(trades):
+            duration = trade.get("duration_seconds")
+            if duration is not None:
+                recent.append(duration)
+                if len(recent) == 10:
+                    break
+        recent.reverse()
         
         return {
-            "average_duration": sum(durations) / len(durations),
-            "shortest_duration": min(durations),
-            "longest_duration": max(durations),
-            "durations": durations[-10:]  # Last 10 durations
+            "average_duration": self._dur_sum / self._dur_count,
+            "shortest_duration": self._dur_min,
+            "longest_duration": self._dur_max,
+            "durations": recent
         }
     
     def get_total_pnl(self) -> Dict:
         """Get total PnL statistics"""
-        if not self.trades:
+        total = self._pnl_buckets["total"].get("total")
+        if total is None:
             return {
                 "total_trades": 0,
                 "total_profit": 0.0,
@@ -344,32 +894,35 @@ class TradeDatabase:
                 "roi": 0.0
             }
         
-        total_profit = 0.0
-        total_loss = 0.0
-        
-        for trade in self.trades:
-            pnl = trade.get("pnl", 0.0)
-            if pnl:
-                if pnl > 0:
-                    total_profit += pnl
-                else:
-                    total_loss += abs(pnl)
-        
+        counters = total[0]
+        total_profit = counters["profit"]
+        total_loss = counters["loss"]
         net_pnl = total_profit - total_loss
         
         # Calculate ROI (simplified - would need initial capital tracking)
         roi = 0.0
-        if self.trades:
-            # Simple ROI calculation
-            total_invested = sum(trade.get("amount_in", 0.0) for trade in self.trades)
-            if total_invested > 0:
-                roi = (net_pnl / total_invested) * 100
+        if self._total_invested > 0:
+            roi = (net_pnl / self._total_invested) * 100
         
         return {
-            "total_trades": len(self.trades),
+            "total_trades": counters["trades"],  # Includes archived trades
             "total_profit": total_profit,
             "total_loss": total_loss,
             "net_pnl": net_pnl,
             "roi": roi
         }
-
+    
+    def get_dashboard_snapshot(self) -> Dict:
+        """
+        Get all dashboard figures in one call
+        
+        Returns:
+            Dictionary with "total_pnl" (same fields as get_total_pnl()),
+            "latency" (1min/1hour/24hours/all_time averages) and
+            "recent_trades" (last 3 successful trades)
+        """
+        return {
+            "total_pnl": self.get_total_pnl(),
+            "latency": self._latency_means(("1min", "1hour", "24hours")),
+            "recent_trades": self.get_successful_trades(3)
+        }
@@ -2,6 +2,8 @@
 Encrypted wallet management for secure private key storage
 """
 import base64
+import hashlib
+from typing import Dict
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
@@ -10,6 +12,9 @@ from solders.pubkey import Pubkey
 import base58
 import os
 
+# Derived Fernet ciphers by SHA-256 of the password, so PBKDF2 runs once per password per process
+_CIPHER_CACHE: Dict[str, Fernet] = {}
+
 class WalletManager:
     """Manages encrypted wallet operations"""
     
@@ -22,10 +27,16 @@ class WalletManager:
         """
         self.password = password or os.getenv("WALLET_PASSWORD", "default_password_change_me")
         self.cipher = self._create_cipher()
+        self._keypairs: Dict[str, Keypair] = {}  # encrypted key -> loaded Keypair
     
     def _create_cipher(self) -> Fernet:
-        """Create Fernet cipher from password"""
+        """Create Fernet cipher from password (cached per password)"""
         password_bytes = self.password.encode()
+        cache_key = hashlib.sha256(password_bytes).hexdigest()
+        cipher = _CIPHER_CACHE.get(cache_key)
+        if cipher is not None:
+            return cipher
+        
         salt = b'solana_bot_salt'  # In production, use random salt
         kdf = PBKDF2HMAC(
             algorithm=hashes.SHA256(),
@@ -34,7 +45,8 @@ class WalletManager:
             iterations=100000,
         )
         key = base64.urlsafe_b64encode(kdf.derive(password_bytes))
-        return Fernet(key)
+        cipher = _CIPHER_CACHE[cache_key] = Fernet(key)
+        return cipher
     
     def encrypt_private_key(self, private_key: str) -> str:
         """
@@ -66,7 +78,7 @@ class WalletManager:
     
     def load_keypair(self, encrypted_key: str) -> Keypair:
         """
-        Load Keypair from encrypted private key
+        Load Keypair from encrypted private key (decrypted once, then cached)
         
         Args:
             encrypted_key: Encrypted private key string
@@ -74,9 +86,12 @@ class WalletManager:
         Returns:
             Solana Keypair object
         """
-        private_key_str = self.decrypt_private_key(encrypted_key)
-        private_key_bytes = base58.b58decode(private_key_str)
-        return Keypair.from_bytes(private_key_bytes)
+        keypair = self._keypairs.get(encrypted_key)
+        if keypair is None:
+            # Decrypted bytes go straight to base58 without a str round-trip
+            private_key_bytes = base58.b58decode(self.cipher.decrypt(encrypted_key.encode()))
+            keypair = self._keypairs[encrypted_key] = Keypair.from_bytes(private_key_bytes)
+        return keypair
     
     def generate_new_keypair(self) -> tuple[str, str]:
         """